@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Time spent by the client in common operations, with the requests handled
+in-process by the fake server of neo4jrestclient.testing, so the results
+don't depend on the network or the load of a real server.
+
+No server is needed.
+
+    $ python benchmarks/client_overhead.py
+"""
+from __future__ import print_function
+import re
+
+from neo4jrestclient.client import GraphDatabase, Node
+from neo4jrestclient.testing import FakeServer, FakeTransport
+
+from timing import measure
+
+
+def create_in_batch(gdb, size=100):
+    with gdb.transaction():
+        for i in range(size):
+            gdb.nodes.create(name="Node %s" % i)
+
+
+def create_many(gdb, size=100):
+    gdb.nodes.create_many({"name": "Node %s" % i} for i in range(size))
+
+
+def main():
+    server = FakeServer()
+    gdb = GraphDatabase(server.url, transport=FakeTransport(server))
+    node = gdb.nodes.create(name="John Doe", age=30)
+    other = gdb.nodes.create(name="Mary Doe")
+    node.relationships.create("Knows", other)
+    server.add_query("MATCH (n) RETURN n", ["n"],
+                     [[server.node(node.id)]] * 100)
+    # Cypher is not run by the fake server, so nodes are created here
+    server.add_query(re.compile(r"^UNWIND \{rows\} AS r CREATE"), ["id(n)"],
+                     lambda params: [[server.create_node(row)]
+                                     for row in params["rows"]])
+    cases = [
+        ("GraphDatabase()", lambda: GraphDatabase(
+            server.url, transport=gdb.transport), 1000),
+        ("nodes.create", lambda: gdb.nodes.create(name="Jane Doe"), 1000),
+        ("nodes[id]", lambda: gdb.nodes[node.id], 1000),
+        ("node[key] = value", lambda: node.set("age", 31), 1000),
+        ("relationships.all", lambda: node.relationships.all(), 1000),
+        ("batch of 100 nodes", lambda: create_in_batch(gdb), 20),
+        ("create_many 100 nodes", lambda: create_many(gdb), 20),
+        ("query 100 nodes", lambda: gdb.query(
+            "MATCH (n) RETURN n", returns=Node)[:], 100),
+    ]
+    print("{:>24} {:>16}".format("operation", "per call (us)"))
+    for name, func, size in cases:
+        print("{:>24} {:>16.2f}".format(name, measure(func, size)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Time needed to encode N datetime values with the default formats, and to
+parse N property values when SMART_DATES is enabled, comparing strftime and
+strptime with the formatters and parsers of neo4jrestclient.codec.
+
+No server is needed.
+
+    $ python benchmarks/dates.py
+"""
+from __future__ import print_function
+import datetime
+
+from neo4jrestclient import options
+from neo4jrestclient.client import Base
+from neo4jrestclient.codec import format_date, strftime
+
+from timing import best_time
+
+
+def get_datetimes(size):
+    start = datetime.datetime(1880, 1, 1)
+    return [start + datetime.timedelta(days=i, microseconds=i)
+            for i in range(size)]
+
+
+def get_values(size):
+    # Property values of time-series events, half of them are not dates
+    values = []
+    for i, dt in enumerate(get_datetimes(size // 2)):
+        values.append(dt.strftime(options.DATETIME_FORMAT))
+        values.append(u"event %s" % i if i % 2 else i)
+    return values
+
+
+def safe_string_strptime(s):
+    # The parsing of dates done by Base._safe_string before
+    try:
+        return datetime.datetime.strptime(s, options.DATETIME_FORMAT)
+    except (ValueError, TypeError):
+        for date_type in ["date", "time"]:
+            try:
+                option = "%s_FORMAT" % date_type.upper()
+                format = getattr(options, option)
+                return getattr(datetime.datetime.strptime(s, format),
+                               date_type)()
+            except (ValueError, TypeError):
+                pass
+    return s
+
+
+def measure(func, values):
+    def run():
+        for value in values:
+            func(value)
+    return best_time(run)
+
+
+def main():
+    size = 100000
+    datetimes = get_datetimes(size)
+    values = get_values(size)
+    options.SMART_DATES = True
+    cases = [
+        ("encode strftime", lambda value: strftime(
+            value, options.DATETIME_FORMAT), datetimes),
+        ("encode format_date", lambda value: format_date(
+            value, options.DATETIME_FORMAT), datetimes),
+        ("parse strptime", safe_string_strptime, values),
+        ("parse _safe_string", Base._safe_string, values),
+    ]
+    print("{:>20} {:>10} {:>10}".format("operation", "values", "time (s)"))
+    for name, func, data in cases:
+        print("{:>20} {:>10} {:>10.4f}".format(name, len(data),
+                                               measure(func, data)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Time needed to encode and decode a batch of N operations creating nodes with
+every JSON codec available.
+
+No server is needed.
+
+    $ python benchmarks/json_codec.py
+"""
+from __future__ import print_function
+import datetime
+import decimal
+
+from neo4jrestclient.codec import CODECS, get_codec
+
+from timing import best_time
+
+
+def get_operations(size):
+    return [{
+        "method": "POST",
+        "to": "/node",
+        "id": i,
+        "body": {
+            "name": u"Jöhn Doe %s" % i,
+            "age": 30,
+            "score": decimal.Decimal("1.5"),
+            "born": datetime.date(1980, 1, 1),
+            "tags": ["a", "b", "c"],
+        },
+    } for i in range(size)]
+
+
+def measure(codec, operations, repeat=5):
+    encoded = codec.encode(operations, ensure_ascii=True)
+    encode = best_time(
+        lambda: codec.encode(operations, ensure_ascii=True), repeat)
+    decode = best_time(lambda: codec.decode(encoded), repeat)
+    return encode, decode
+
+
+def main():
+    print("{:>10} {:>10} {:>12} {:>12}".format("codec", "operations",
+                                               "encode (s)", "decode (s)"))
+    for name in sorted(CODECS.keys()):
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            continue
+        for size in (1000, 10000, 100000):
+            encode, decode = measure(codec, get_operations(size))
+            print("{:>10} {:>10} {:>12.4f} {:>12.4f}".format(
+                name, size, encode, decode))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Timing helpers shared by the benchmarks, imported as a sibling module when
+running any of them as a script.
+"""
+import time
+
+
+def best_time(func, repeat=3):
+    """
+    Return the seconds taken by the fastest of repeat calls to func.
+    """
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def measure(func, size, repeat=3):
+    """
+    Return the microseconds per call to func, in the fastest of repeat runs
+    of size calls.
+    """
+    def run():
+        for i in range(size):
+            func()
+    return best_time(run, repeat) * 1e6 / size
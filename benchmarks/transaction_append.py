@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Time needed to build a batch transaction setting properties on N nodes.
+
+No server is needed, since the transaction is never committed. The time per
+operation should stay constant as the number of operations grows.
+
+    $ python benchmarks/transaction_append.py
+"""
+from __future__ import print_function
+import time
+
+from neo4jrestclient.client import Node, Transaction
+
+URL = "http://localhost:7474/db/data/"
+
+
+class FakeGraphDatabase(object):
+    url = URL
+    _batch = "%sbatch" % URL
+
+
+def get_node(node_id):
+    node_url = "%snode/%s" % (URL, node_id)
+    return Node(node_url, update_dict={
+        "self": node_url,
+        "data": {},
+        "property": "%s/properties/{key}" % node_url,
+        "properties": "%s/properties" % node_url,
+    })
+
+
+def build_transaction(size):
+    nodes = [get_node(i) for i in range(size)]
+    tx = Transaction(FakeGraphDatabase(), 0, {})
+    start = time.time()
+    for node in nodes:
+        node.set("name", "John Doe", tx=tx)
+        node.set("age", 30, tx=tx)
+    return time.time() - start, len(tx.operations)
+
+
+def main():
+    print("{:>10} {:>12} {:>12} {:>14}".format("nodes", "operations",
+                                               "seconds", "us/operation"))
+    for size in (1000, 2000, 4000, 8000, 16000, 32000, 64000):
+        elapsed, operations = build_transaction(size)
+        print("{:>10} {:>12} {:>12.4f} {:>14.2f}".format(
+            size, operations, elapsed, elapsed * 1e6 / (2 * size)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,849 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio support for neo4j-rest-client (Python 3.5+).
+
+AsyncGraphDatabase mirrors GraphDatabase, but every operation that needs the
+server is a coroutine. Nodes, relationships and paths returned are the same
+classes used by GraphDatabase, already populated with the representations
+received from the server. Their methods that need the server would block the
+event loop, so they raise a BlockingRequestError while it is running, and the
+proxies of AsyncGraphDatabase provide coroutines for them instead.
+"""
+import asyncio
+import json
+import ssl
+import time
+
+try:
+    import aiohttp
+except ImportError:
+    raise ImportError("aiohttp needs to be installed in order to use "
+                      "AsyncGraphDatabase in neo4jrestclient. \n"
+                      "Please, run $ pip install aiohttp")
+
+from neo4jrestclient.cache import EntityCache
+from neo4jrestclient.codec import get_codec
+from neo4jrestclient import options
+from neo4jrestclient.client import (
+    Base, Node, Relationship, Path, Position, BATCH_REFERENCE
+)
+from neo4jrestclient.constants import (
+    RAW, NODE, RELATIONSHIP, PATH, POSITION
+)
+from neo4jrestclient.exceptions import (
+    NotFoundError, StatusException, TransactionException
+)
+from neo4jrestclient.query import CypherException, QuerySequence
+from neo4jrestclient.query import QueryTransaction
+from neo4jrestclient.request import (
+    IDEMPOTENT_METHODS, Request, Transport
+)
+from neo4jrestclient.utils import get_auth_from_uri, smart_quote
+
+
+__all__ = ["AsyncGraphDatabase", "AsyncTransport", "BlockingRequestError"]
+
+try:
+    _get_running_loop = asyncio.get_running_loop
+except AttributeError:  # Python < 3.7
+    _get_running_loop = asyncio.get_event_loop
+
+
+class BlockingRequestError(RuntimeError):
+    """
+    Raised when a node or relationship returned by AsyncGraphDatabase needs
+    the server while the event loop is running in the same thread.
+    """
+
+
+class _EntityTransport(Transport):
+    """
+    Blocking transport of the nodes and relationships returned by
+    AsyncGraphDatabase, only allowed when no event loop is running in the
+    thread (e.g. in an executor).
+    """
+
+    def request(self, method, url, **kwargs):
+        try:
+            running = _get_running_loop().is_running()
+        except RuntimeError:
+            running = False
+        if running:
+            raise BlockingRequestError(
+                "Nodes and relationships of AsyncGraphDatabase would block "
+                "the event loop requesting %s %s. Await the methods of "
+                "nodes, relationships and labels of AsyncGraphDatabase, "
+                "or run it in an executor" % (method, url))
+        return super(_EntityTransport, self).request(method, url, **kwargs)
+
+
+class AsyncResponse(object):
+    """
+    Response already read from the server, with the subset of the interface
+    of the responses of requests used by neo4j-rest-client.
+    """
+
+    def __init__(self, status_code, headers, content, encoding=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, "replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AsyncTransport(object):
+    """
+    Pool of HTTP connections for an event loop, owned by an
+    AsyncGraphDatabase.
+
+    Up to pool_maxsize connections are open at the same time, at most
+    pool_maxsize_per_host for the same host, so any number of concurrent
+    requests are multiplexed over them. Idle connections are closed after
+    keep_alive seconds.
+
+    Failed requests are retried like in Transport, up to max_retries times
+    with a random backoff, while the time since the first attempt is below
+    retry_deadline seconds.
+    """
+
+    def __init__(self, pool_maxsize=100, pool_maxsize_per_host=0,
+                 keep_alive=None, max_retries=3, backoff_factor=0.1,
+                 backoff_max=10, retry_deadline=None):
+        self.pool_maxsize = pool_maxsize
+        self.pool_maxsize_per_host = pool_maxsize_per_host
+        self.keep_alive = keep_alive
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_deadline = retry_deadline
+        self.retries = 0
+        self.retries_exhausted = 0
+        self.session = None
+        self._ssl_contexts = {}
+        self._prepared = {}
+
+    prepare = Transport.prepare
+    _get_retry_after = Transport._get_retry_after
+    _get_retry_delay = Transport._get_retry_delay
+
+    def _get_session(self):
+        # Sessions must be created inside a running event loop
+        if self.session is None or self.session.closed:
+            connector_kwargs = {
+                "limit": self.pool_maxsize,
+                "limit_per_host": self.pool_maxsize_per_host,
+            }
+            if self.keep_alive is not None:
+                connector_kwargs["keepalive_timeout"] = self.keep_alive
+            connector = aiohttp.TCPConnector(**connector_kwargs)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    def _get_ssl(self, cert, verify):
+        if not cert:
+            return None if verify else False
+        key = (cert, verify)
+        if key not in self._ssl_contexts:
+            context = ssl.create_default_context()
+            if isinstance(cert, (tuple, list)):
+                context.load_cert_chain(*cert)
+            else:
+                context.load_cert_chain(cert)
+            if not verify:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            self._ssl_contexts[key] = context
+        return self._ssl_contexts[key]
+
+    async def _send(self, method, url, headers, data, auth, ssl_context):
+        session = self._get_session()
+        async with session.request(method, url, headers=headers, data=data,
+                                   auth=auth, ssl=ssl_context) as resp:
+            content = await resp.read()
+            return AsyncResponse(resp.status, resp.headers, content,
+                                 encoding=resp.charset)
+
+    async def request(self, method, url, headers=None, data=None, cert=None,
+                      auth=None, verify=True, idempotent=None, deadline=None,
+                      **kwargs):
+        """
+        Send a request, retrying it if needed, as Transport.request does.
+        """
+        if auth is not None:
+            auth = aiohttp.BasicAuth(*auth)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        if deadline is None:
+            deadline = self.retry_deadline
+        ssl_context = self._get_ssl(cert, verify)
+        start = time.time()
+        retries = 0
+        while True:
+            response = None
+            error = None
+            try:
+                response = await self._send(method, url, headers, data, auth,
+                                            ssl_context)
+            except aiohttp.ClientConnectorError as e:
+                # The request was not sent
+                error = e
+                retry_after = 0
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+                retry_after = 0 if idempotent else None
+            else:
+                retry_after = self._get_retry_after(url, idempotent, response)
+            if retry_after is None:
+                break
+            delay = self._get_retry_delay(retries, retry_after, start,
+                                          deadline)
+            if delay is None:
+                self.retries_exhausted += 1
+                break
+            retries += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return response
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class AsyncRequest(Request):
+    """
+    Request whose get, post, put and delete methods return awaitables.
+    """
+
+    async def _request(self, method, url, data={}, headers={}, stream=False,
+                       idempotent=None, deadline=None):
+        root_uri, kwargs = self._prepare(method, url, data, headers)
+        response = await self.transport.request(method, root_uri,
+                                                idempotent=idempotent,
+                                                deadline=deadline, **kwargs)
+        if response.status_code == 401:
+            raise StatusException(401, "Authorization Required")
+        return self._json_decode(response)
+
+
+def _raise_status(response, msg):
+    try:
+        msg += ": " + response.json().get('message')
+    except (ValueError, AttributeError, KeyError):
+        pass
+    raise StatusException(response.status_code, msg)
+
+
+class AsyncQueryResults(list):
+    """
+    Casted rows of the result of a Cypher query.
+    """
+
+    def __init__(self, result, types, auth=None, cypher=None, returns=None):
+        self.columns = result.get("columns", None)
+        self.stats = result.get("stats", None)
+        self._types = types
+        self._auth = auth
+        self._cypher = cypher
+        self._return_single_rows = False
+        self._elements_row = None
+        self._elements_graph = None
+        elements = QuerySequence.cast(self, elements=result.get("data", []),
+                                      returns=returns)
+        super(AsyncQueryResults, self).__init__(elements)
+
+    @property
+    def rows(self):
+        return self._elements_row
+
+    @property
+    def graph(self):
+        return self._elements_graph
+
+
+class AsyncQueryTransaction(object):
+    """
+    Transaction for the transactional Cypher endpoint. Every query is sent
+    to the server when awaited, and the transaction is committed or rolled
+    back when the context manager exits.
+    """
+
+    def __init__(self, gdb, commit=True, rollback=True):
+        self._gdb = gdb
+        self.url_begin = gdb._transaction
+        self.url_tx = None
+        self.url_commit = None
+        self.expires = None
+        self.finished = False
+        self.auto_commit = commit
+        self.auto_rollback = rollback
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type, value, traceback):
+        if not self.finished:
+            if value is not None:
+                if self.auto_rollback:
+                    await self.rollback()
+            elif self.auto_commit:
+                await self.commit()
+
+    async def _execute(self, url, statements):
+        response = await self._gdb._request().post(url, data={
+            "statements": statements,
+        })
+        if response.status_code not in (200, 201):
+            raise TransactionException(response.status_code)
+        content = response.json()
+        QueryTransaction._manage_errors(content["errors"])
+        if "commit" in content:
+            self.url_commit = content["commit"]
+        if content.get("transaction"):
+            self.expires = content["transaction"]["expires"]
+        if self.url_tx is None:
+            self.url_tx = response.headers.get("location")
+        return content["results"]
+
+    async def query(self, q, params=None, returns=RAW):
+        if self.finished:
+            raise TransactionException(200, "Transaction already finished")
+        statement = {
+            "statement": q,
+            "parameters": params or {},
+            "resultDataContents": ["REST"],
+        }
+        results = await self._execute(self.url_tx or self.url_begin,
+                                      [statement])
+        return self._gdb._get_query_results(results[0], returns)
+
+    async def commit(self):
+        if self.url_commit:
+            await self._execute(self.url_commit, [])
+        self.finished = True
+
+    async def rollback(self):
+        if self.url_tx:
+            response = await self._gdb._request().delete(self.url_tx)
+            if response.status_code not in (200, 201):
+                raise TransactionException(response.status_code)
+            QueryTransaction._manage_errors(response.json()["errors"])
+        self.finished = True
+
+
+class AsyncBatch(object):
+    """
+    Operations sent together to the batch endpoint when committed. As in
+    transactions, "{N}" in the URL of an operation refers to the result of
+    the N-th operation.
+    """
+
+    def __init__(self, gdb):
+        self._gdb = gdb
+        self.operations = []
+        self.finished = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type, value, traceback):
+        if value is None and not self.finished:
+            await self.commit()
+
+    def append(self, method, to, body=None):
+        """
+        Add the operation and return its id.
+        """
+        job_id = len(self.operations)
+        # URLs are relative to the root of the database in batch operations
+        url = self._gdb.url
+        if to.startswith(url):
+            to = to[len(url) - 1:]
+        elif not to.startswith("/") and not BATCH_REFERENCE.match(to):
+            to = "/%s" % to
+        operation = {"id": job_id, "method": method, "to": to}
+        if body is not None:
+            operation["body"] = body
+        self.operations.append(operation)
+        return job_id
+
+    async def commit(self):
+        """
+        Send the operations and return the bodies of their results, in the
+        same order.
+        """
+        self.finished = True
+        if not self.operations:
+            return []
+        response = await self._gdb._request().post(self._gdb._batch,
+                                                   data=self.operations)
+        if response.status_code != 200:
+            _raise_status(response, "Invalid data sent")
+        results = dict((result["id"], result.get("body", None))
+                       for result in response.json())
+        return [results.get(operation["id"], None)
+                for operation in self.operations]
+
+
+class AsyncPaginatedTraversal(object):
+    """
+    Asynchronous iterator over the pages of a traversal.
+    """
+
+    def __init__(self, gdb, url, returns, data=None, paged=True):
+        self._gdb = gdb
+        self.url = url
+        self.returns = returns
+        self.data = data
+        self._paged = paged
+        self._next_url = None
+        self._started = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        request = self._gdb._request()
+        if not self._started:
+            self._started = True
+            response = await request.post(self.url, data=self.data)
+            if response.status_code == 404:
+                raise NotFoundError(response.status_code,
+                                    "Node or relationship not found")
+            elif response.status_code not in (200, 201):
+                _raise_status(response, "Invalid data sent")
+        elif self._next_url:
+            response = await request.get(self._next_url)
+            if response.status_code != 200:
+                raise StopAsyncIteration
+        else:
+            raise StopAsyncIteration
+        if self._paged:
+            self._next_url = response.headers.get(
+                "location",
+                response.headers.get("content-location")
+            )
+        results = response.json()
+        if not results:
+            raise StopAsyncIteration
+        return self._gdb._get_traversal_results(results, self.returns)
+
+
+class AsyncNodesProxy(object):
+    """
+    Class proxy for nodes of an AsyncGraphDatabase.
+    """
+
+    def __init__(self, gdb, url):
+        self._gdb = gdb
+        self.url = url
+
+    def _get_url(self, key):
+        if isinstance(key, Node):
+            return key.url
+        key = "%s" % key
+        if key.startswith(self.url):
+            return key
+        return "%s/%s" % (self.url, key)
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    async def get(self, key):
+        response = await self._gdb._request().get(self._get_url(key))
+        if response.status_code == 200:
+            return self._gdb._get_element(Node, response.json())
+        elif response.status_code == 404:
+            raise NotFoundError(response.status_code, "Node not found")
+        else:
+            _raise_status(response, "Invalid data sent")
+
+    async def create(self, **properties):
+        response = await self._gdb._request().post(self.url, data=properties)
+        if response.status_code == 201:
+            return self._gdb._get_element(Node, response.json())
+        else:
+            _raise_status(response, "Invalid data sent")
+
+    async def delete(self, key):
+        url = self._get_url(key)
+        response = await self._gdb._request().delete(url)
+        if response.status_code == 204:
+            self._gdb._forget(url)
+        elif response.status_code == 404:
+            raise NotFoundError(response.status_code, "Node not found")
+        else:
+            _raise_status(response, "Node could not be deleted (still has "
+                                    "relationships?)")
+
+    async def set_property(self, element, key, value):
+        """
+        Set the property key of element, as element[key] = value does.
+        """
+        url = element._dic["property"].replace("{key}", smart_quote(key))
+        response = await self._gdb._request().put(url, data=value)
+        if response.status_code == 204:
+            self._gdb._invalidate(element.url)
+            if options.SMART_DATES:
+                value = Base._safe_string(value)
+            element._dic["data"][key] = value
+        elif response.status_code == 404:
+            raise NotFoundError(response.status_code,
+                                "Node or property not found")
+        else:
+            _raise_status(response, "Invalid data sent")
+
+    async def set_properties(self, element, properties):
+        """
+        Replace all the properties of element, as element.properties = ...
+        does.
+        """
+        url = element._dic["properties"]
+        response = await self._gdb._request().put(url, data=properties)
+        if response.status_code == 204:
+            self._gdb._invalidate(element.url)
+            element._dic["data"] = dict(properties)
+        elif response.status_code == 404:
+            raise NotFoundError(response.status_code, "Properties not found")
+        else:
+            _raise_status(response, "Invalid data sent")
+
+    async def delete_property(self, element, key):
+        """
+        Remove the property key of element, as del element[key] does.
+        """
+        url = element._dic["property"].replace("{key}", smart_quote(key))
+        response = await self._gdb._request().delete(url)
+        if response.status_code == 204:
+            self._gdb._invalidate(element.url)
+            element._dic["data"].pop(key, None)
+        elif response.status_code == 404:
+            raise NotFoundError(response.status_code,
+                                "Node or property not found")
+        else:
+            _raise_status(response, "Node or property not found")
+
+
+class AsyncRelationshipsProxy(AsyncNodesProxy):
+    """
+    Class proxy for relationships of an AsyncGraphDatabase.
+    """
+
+    def _get_url(self, key):
+        if isinstance(key, Relationship):
+            return key.url
+        return super(AsyncRelationshipsProxy, self)._get_url(key)
+
+    async def get(self, key):
+        response = await self._gdb._request().get(self._get_url(key))
+        if response.status_code == 200:
+            return self._gdb._get_element(Relationship, response.json())
+        elif response.status_code == 404:
+            raise NotFoundError(response.status_code,
+                                "Relationship not found")
+        else:
+            _raise_status(response, "Invalid data sent")
+
+    async def create(self, start, relationship_type, end, **properties):
+        url = "%s/relationships" % start.url.rstrip("/")
+        data = {
+            "to": end.url,
+            "type": relationship_type,
+            "data": properties,
+        }
+        response = await self._gdb._request().post(url, data=data)
+        if response.status_code == 201:
+            return self._gdb._get_element(Relationship, response.json())
+        elif response.status_code == 404:
+            raise NotFoundError(response.status_code, "Node not found")
+        else:
+            _raise_status(response, "Invalid data sent")
+
+    async def _get_node_relationships(self, node, direction, types):
+        if types:
+            url = node._dic["%s_typed_relationships" % direction].replace(
+                "{-list|&|types}", "&".join(types))
+        else:
+            url = node._dic["%s_relationships" % direction]
+        response = await self._gdb._request().get(url)
+        if response.status_code == 200:
+            return [self._gdb._get_element(Relationship, relationship)
+                    for relationship in response.json()]
+        elif response.status_code == 404:
+            raise NotFoundError(response.status_code, "Node not found")
+        else:
+            _raise_status(response, "Node not found")
+
+    async def all(self, node, types=None):
+        """
+        Return the relationships of node, of any of the types if given, as
+        node.relationships.all() does.
+        """
+        return await self._get_node_relationships(node, "all", types)
+
+    async def incoming(self, node, types=None):
+        return await self._get_node_relationships(node, "incoming", types)
+
+    async def outgoing(self, node, types=None):
+        return await self._get_node_relationships(node, "outgoing", types)
+
+
+class AsyncLabelsProxy(object):
+    """
+    Class proxy for labels of an AsyncGraphDatabase.
+    """
+
+    def __init__(self, gdb, url):
+        self._gdb = gdb
+        self.url = url
+
+    async def all(self, node=None):
+        """
+        Return the names of all the labels in the database, or of the labels
+        of node if given.
+        """
+        if node is not None:
+            url = "%s/labels" % node.url.rstrip("/")
+        else:
+            url = self.url
+        response = await self._gdb._request().get(url)
+        if response.status_code != 200:
+            _raise_status(response, "Unable to read label(s)")
+        return response.json()
+
+    async def get(self, label, **properties):
+        """
+        Return the nodes with label, filtered by the values of properties.
+        """
+        data = u""
+        if properties:
+            data = []
+            for k, v in properties.items():
+                data.append("{}={}".format(smart_quote(k),
+                                           smart_quote(json.dumps(v))))
+            data = u"?{}".format(u"&".join(data))
+        url = self.url.replace(
+            u"labels",
+            u"label/{}/nodes{}".format(smart_quote(label), data))
+        response = await self._gdb._request().get(url)
+        if response.status_code != 200:
+            _raise_status(response, "Unable to read label(s)")
+        return [self._gdb._get_element(Node, node)
+                for node in response.json()]
+
+    async def add(self, node, *labels):
+        url = "%s/labels" % node.url.rstrip("/")
+        response = await self._gdb._request().post(url, data=list(labels))
+        if response.status_code != 204:
+            _raise_status(response, "Unable to add label")
+        self._gdb._invalidate(node.url)
+
+    async def remove(self, node, label):
+        url = "%s/labels/%s" % (node.url.rstrip("/"), smart_quote(label))
+        response = await self._gdb._request().delete(url)
+        if response.status_code == 404:
+            raise NotFoundError(response.status_code, "Label not found")
+        elif response.status_code != 204:
+            _raise_status(response, "Unable to remove label")
+        self._gdb._invalidate(node.url)
+
+
+class AsyncGraphDatabase(object):
+    """
+    Main class for asynchronous connections to Neo4j standalone REST server.
+
+    The root of the database is requested when awaiting connect(), or when
+    entering the object as an asynchronous context manager.
+    """
+
+    def __init__(self, url, username=None, password=None, cert_file=None,
+                 key_file=None, transport=None, entity_cache=None,
+                 json_codec=None, **kwargs):
+        username_uri, password_uri, xxx = get_auth_from_uri(url)
+        username = username or username_uri
+        password = password or password_uri
+        # Connection pool settings, like pool_maxsize or keep_alive
+        if transport is None:
+            transport = AsyncTransport(**kwargs)
+        self.transport = transport
+        # Identity map for nodes and relationships, disabled by default
+        if entity_cache is True:
+            entity_cache = EntityCache()
+        elif entity_cache is False:
+            entity_cache = None
+        self.entity_cache = entity_cache
+        # Encoder and decoder of JSON, the fastest one available by default
+        self.codec = get_codec(json_codec)
+        # Nodes and relationships returned use blocking requests when their
+        # methods need the server, only allowed outside of the event loop
+        self._auth = {
+            "username": username,
+            "password": password,
+            "cert_file": cert_file,
+            "key_file": key_file,
+            "transport": _EntityTransport(),
+            "entity_cache": self.entity_cache,
+            "codec": self.codec,
+        }
+        self._types = {
+            "node": Node,
+            "relationship": Relationship,
+            "path": Path,
+            "position": Position,
+        }
+        if url.endswith("/"):
+            self.url = url
+        else:
+            self.url = "%s/" % url
+        self.VERSION = None
+        self.nodes = None
+        self.relationships = None
+        self.labels = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, type, value, traceback):
+        await self.close()
+
+    def _request(self):
+        auth = dict(self._auth, transport=self.transport)
+        return AsyncRequest(**auth)
+
+    async def connect(self):
+        response = await self._request().get(self.url)
+        if response.status_code == 200:
+            response_json = response.json()
+        else:
+            raise NotFoundError(response.status_code, "Unable get root")
+        if "data" in response_json and "management" in response_json:
+            response = await self._request().get(response_json["data"])
+            if response.status_code == 200:
+                response_json = response.json()
+            else:
+                raise NotFoundError(response.status_code, "Unable get root")
+        self._node = response_json['node']
+        self._labels = response_json.get('node_labels',
+                                         "{}labels".format(self.url))
+        self._cypher = response_json.get('cypher', None)
+        self._transaction = response_json.get('transaction', None)
+        self._batch = response_json.get('batch', "%sbatch" % self.url)
+        self.VERSION = response_json.get('neo4j_version', None)
+        if self.VERSION:
+            self._auth.update({'version': self.VERSION})
+        # HACK: Neo4j doesn't provide the URLs to access to relationships
+        url_parts = self._node.rpartition("node")
+        self._relationship = "%s%s%s" % (url_parts[0], RELATIONSHIP,
+                                         url_parts[2])
+        self.nodes = AsyncNodesProxy(self, self._node)
+        self.relationships = AsyncRelationshipsProxy(self, self._relationship)
+        self.labels = AsyncLabelsProxy(self, self._labels)
+        return self
+
+    async def close(self):
+        await self.transport.close()
+
+    def _get_element(self, cls, data):
+        return cls(data["self"], update_dict=data, auth=self._auth,
+                   cypher=self._cypher)
+
+    def _invalidate(self, url):
+        if self.entity_cache is not None:
+            self.entity_cache.invalidate(url)
+
+    def _forget(self, url):
+        if self.entity_cache is not None:
+            self.entity_cache.invalidate(url, forget=True)
+
+    def _get_query_results(self, result, returns):
+        return AsyncQueryResults(result, self._types, auth=self._auth,
+                                 cypher=self._cypher, returns=returns)
+
+    def _get_traversal_results(self, results, returns):
+        if returns == NODE:
+            return [self._get_element(Node, result) for result in results]
+        elif returns == RELATIONSHIP:
+            return [self._get_element(Relationship, result)
+                    for result in results]
+        elif returns == PATH:
+            return [Path(result, auth=self._auth, cypher=self._cypher)
+                    for result in results]
+        elif returns == POSITION:
+            return [Position(result, auth=self._auth, cypher=self._cypher)
+                    for result in results]
+
+    async def query(self, q, params=None, returns=RAW, tx=None):
+        if tx is not None:
+            return await tx.query(q, params=params, returns=returns)
+        if self.VERSION and self.VERSION.split(".")[0] >= "2":
+            url = u"{}/commit".format(self._transaction)
+            data = {
+                "statements": [{
+                    "statement": q,
+                    "parameters": params or {},
+                    "resultDataContents": ["REST"],
+                }],
+            }
+        elif self._cypher:
+            url = self._cypher
+            data = {
+                "query": q,
+                "params": params or {},
+            }
+        else:
+            raise CypherException
+        response = await self._request().post(url, data=data)
+        if response.status_code == 400:
+            err_msg = u"Cypher query exception"
+            try:
+                err_msg = "%s: %s" % (err_msg, response.json()["message"])
+            except (ValueError, KeyError):
+                err_msg = "%s: %s" % (err_msg, response.text)
+            raise CypherException(err_msg)
+        elif response.status_code not in (200, 201):
+            _raise_status(response, "Invalid data sent")
+        content = response.json()
+        if "results" in content:
+            QueryTransaction._manage_errors(content["errors"])
+            result = content["results"][0]
+        else:
+            # Same format for rows of the legacy Cypher endpoint
+            result = dict(content)
+            result["data"] = [{"rest": row} for row in content["data"]]
+        return self._get_query_results(result, returns)
+
+    def transaction(self, commit=True, rollback=True):
+        return AsyncQueryTransaction(self, commit=commit, rollback=rollback)
+
+    def batch(self):
+        return AsyncBatch(self)
+
+    def traverse(self, start_node, returns=NODE, page_size=None,
+                 time_out=None, **kwargs):
+        """
+        Return an asynchronous iterator over the pages of results, as lists,
+        of the traversal from start_node. types, order, stop, returnable and
+        uniqueness can be passed as in Node.traverse.
+        """
+        data = Node._get_traverse_data(**kwargs)
+        if returns not in (NODE, RELATIONSHIP, PATH, POSITION):
+            returns = NODE
+        if "paged_traverse" in start_node._dic:
+            url = start_node._get_paged_traverse_url(returns, page_size,
+                                                     time_out)
+            paged = True
+        else:
+            url = start_node._dic["traverse"].replace("{returnType}", returns)
+            paged = False
+        return AsyncPaginatedTraversal(self, url, returns, data=data,
+                                       paged=paged)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+import threading
+import time
+import weakref
+
+
+class EntityCache(object):
+    """
+    Identity map for nodes and relationships of a GraphDatabase.
+
+    While an element is alive, the same instance is returned for its URL.
+    Besides, the last max_size representations received from the server are
+    kept for ttl seconds (forever if ttl is None), so new instances for those
+    URLs do not need a new request.
+    """
+
+    def __init__(self, max_size=1000, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._objects = weakref.WeakValueDictionary()
+        self._payloads = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(url):
+        return url.rstrip("/")
+
+    def get_object(self, cls, url):
+        obj = self._objects.get(self._key(url), None)
+        if obj is not None and obj.__class__ is cls:
+            return obj
+        return None
+
+    def add_object(self, obj):
+        self._objects[self._key(obj.url)] = obj
+
+    def get(self, url):
+        """
+        Return a copy of the cached representation for url, or None.
+        """
+        key = self._key(url)
+        with self._lock:
+            try:
+                timestamp, payload = self._payloads.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            if self.ttl is not None and time.time() - timestamp > self.ttl:
+                self.misses += 1
+                self.evictions += 1
+                return None
+            # Move the entry to the end, as the most recently used
+            self._payloads[key] = (timestamp, payload)
+            self.hits += 1
+        payload = payload.copy()
+        if "data" in payload:
+            payload["data"] = payload["data"].copy()
+        return payload
+
+    def set(self, url, payload):
+        key = self._key(url)
+        payload = payload.copy()
+        if "data" in payload:
+            payload["data"] = payload["data"].copy()
+        with self._lock:
+            self._payloads.pop(key, None)
+            self._payloads[key] = (time.time(), payload)
+            while len(self._payloads) > self.max_size:
+                self._payloads.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, url, forget=False):
+        """
+        Remove the representation for url. If forget is True, the instance
+        is also removed from the identity map.
+        """
+        key = self._key(url)
+        with self._lock:
+            if self._payloads.pop(key, None) is not None:
+                self.invalidations += 1
+            if forget:
+                self._objects.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._payloads.clear()
+            self._objects.clear()
+
+    def __len__(self):
+        return len(self._payloads)
+
+    def __contains__(self, url):
+        return self._key(url) in self._payloads
+
+    @property
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._payloads),
+            "max_size": self.max_size,
+        }
+
+    # Special methods for handle pickling manually
+    def __getstate__(self):
+        return {"max_size": self.max_size, "ttl": self.ttl}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
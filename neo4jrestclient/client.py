@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
+import collections
 from datetime import date, datetime, time
 try:
     import cPickle as pickle
 except:
     import pickle
+import itertools
+import re
 import weakref
 import warnings
 try:
@@ -14,6 +17,8 @@ except:
             raise ImportError("Try installing lucene-querybuilder first.")
 
 from neo4jrestclient import options
+from neo4jrestclient.cache import EntityCache
+from neo4jrestclient.codec import get_codec, parse_date
 from neo4jrestclient.constants import (
     BREADTH_FIRST, DEPTH_FIRST,
     STOP_AT_END_OF_GRAPH,
@@ -28,12 +33,16 @@ from neo4jrestclient.constants import (
 )
 from neo4jrestclient.iterable import Iterable
 from neo4jrestclient.labels import NodeLabelsProxy, LabelsProxy
+from neo4jrestclient.metrics import NPlusOneDetector
 from neo4jrestclient.query import (
-    QuerySequence, FilterSequence, QueryTransaction, CypherException
+    QuerySequence, QueryStream, FilterSequence, QueryTransaction,
+    CypherException, is_read_query
 )
-from neo4jrestclient.request import Request
+from neo4jrestclient.request import Request, Transport
+from neo4jrestclient.routing import PRIMARY, Router
 from neo4jrestclient.exceptions import (NotFoundError, StatusException,
-                                        TransactionException)
+                                        TransactionException,
+                                        PartialTransactionException)
 from neo4jrestclient.traversals import TraversalDescription, GraphTraversal
 from neo4jrestclient.utils import (PY2, text_type, smart_quote, string_types,
                                    unquote, get_auth_from_uri)
@@ -41,6 +50,15 @@ from neo4jrestclient.utils import (PY2, text_type, smart_quote, string_types,
 __all__ = ["GraphDatabase", "Incoming", "Outgoing", "Undirected",
            "StopAtDepth", "NotFoundError", "StatusException", "Q"]
 
+# References to the results of previous jobs in batch operations
+BATCH_REFERENCE = re.compile(r"\{(\d+)\}")
+
+# What to do with the elements not found when getting many
+MISSING_SKIP = "skip"
+MISSING_NONE = "none"
+MISSING_RAISE = "raise"
+MISSING_POLICIES = (MISSING_SKIP, MISSING_NONE, MISSING_RAISE)
+
 
 class StopAtDepth(object):
     """
@@ -57,18 +75,49 @@ class StopAtDepth(object):
 class GraphDatabase(object):
     """
     Main class for connection to Ne4j standalone REST server.
+
+    The url can also be a list of tuples of URL and role ("primary" or
+    "replica"), or a Router object, to send writes to the primary and
+    balance reads across the replicas.
     """
 
     def __init__(self, url, username=None, password=None, cert_file=None,
-                 key_file=None):
+                 key_file=None, transport=None, entity_cache=None,
+                 json_codec=None, **kwargs):
+        router = None
+        if isinstance(url, (list, tuple)):
+            router = Router(url)
+            # The primary is the root, keeping the credentials of its URL
+            url = dict((role, endpoint_url)
+                       for endpoint_url, role in url)[PRIMARY]
+        elif isinstance(url, Router):
+            router = url
+            url = router.primary.url
         username_uri, password_uri, xxx = get_auth_from_uri(url)
         username = username or username_uri
         password = password or password_uri
+        # Connection pool settings, like pool_maxsize or keep_alive
+        if transport is None:
+            transport = Transport(router=router, **kwargs)
+        elif router is not None:
+            transport.router = router
+        self.transport = transport
+        # Identity map for nodes and relationships, disabled by default
+        if entity_cache is True:
+            entity_cache = EntityCache()
+        elif entity_cache is False:
+            entity_cache = None
+        self.entity_cache = entity_cache
+        # Encoder and decoder of JSON, the fastest one available by default
+        self.codec = get_codec(json_codec)
         self._auth = {
             "username": username,
             "password": password,
             "cert_file": cert_file,
             "key_file": key_file,
+            "transport": transport,
+            "entity_cache": self.entity_cache,
+            "codec": self.codec,
         }
         self._transactions = {}
         self.url = None
@@ -105,17 +154,18 @@ class GraphDatabase(object):
             self._extensions_cache = None
             self.nodes = NodesProxy(self._node, self._reference_node,
                                     self._node_index,
-                                    auth=self._auth, cypher=self._cypher)
+                                    auth=self._auth, cypher=self._cypher,
+                                    transaction=self._transaction)
             # Backward compatibility. The current style is more pythonic
             self.node = self.nodes
             # HACK: Neo4j doesn't provide the URLs to access to relationships
             url_parts = self._node.rpartition("node")
             self._relationship = "%s%s%s" % (url_parts[0], RELATIONSHIP,
                                              url_parts[2])
-            self.relationships = RelationshipsProxy(self._relationship,
-                                                    self._relationship_index,
-                                                    auth=self._auth,
-                                                    cypher=self._cypher)
+            self.relationships = RelationshipsProxy(
+                self._relationship, self._relationship_index,
+                auth=self._auth, cypher=self._cypher,
+                transaction=self._transaction)
             self.Traversal = GraphTraversal
             try:
                 self._batch = response_json["batch"]
@@ -168,9 +218,39 @@ class GraphDatabase(object):
     def traversal(self):
         return TraversalDescription(auth=self._auth, cypher=self._cypher)
 
+    def check_health(self):
+        """
+        Request the root of every endpoint, if the url was a list of
+        endpoints, and return the healthy ones.
+        """
+        if self.transport.router is None:
+            return []
+        return self.transport.router.check_health(Request(**self._auth))
+
+    def detect_n_plus_one(self, threshold=10, raises=False):
+        """
+        Return a context manager, also usable as a decorator, that warns (or
+        raises an exception) when the same endpoint is requested more than
+        threshold times inside it.
+        """
+        return NPlusOneDetector(self.transport, threshold=threshold,
+                                raises=raises)
+
     def transaction(self, using_globals=True, commit=True, update=True,
                     transaction_id=None, context=None, for_query=False,
-                    rollback=True, execute=False):
+                    rollback=True, execute=False, max_operations=None,
+                    max_bytes=None):
+        """
+        Return a transaction whose operations are sent in one batch request
+        when committed, or a transaction for Cypher queries if for_query is
+        True.
+
+        max_operations and max_bytes split the operations in several
+        batches, each one executed in its own transaction, so the
+        transaction is no longer atomic: if a batch fails, a
+        PartialTransactionException is raised with the results of the
+        batches already committed in its committed attribute.
+        """
         if transaction_id not in self._transactions:
             transaction_id = len(self._transactions.keys())
         if for_query:
@@ -185,13 +265,16 @@ class GraphDatabase(object):
                                   execute=execute)
         else:
             tx = Transaction(self, transaction_id, context or {},
-                             commit=commit, update=update)
+                             commit=commit, update=update,
+                             max_operations=max_operations,
+                             max_bytes=max_bytes)
         self._transactions[transaction_id] = tx
         if using_globals:
             globals()[options.TX_NAME] = self._transactions[transaction_id]
         return self._transactions[transaction_id]
 
-    def query(self, q, params=None, returns=RAW, data_contents=None, tx=None):
+    def query(self, q, params=None, returns=RAW, data_contents=None, tx=None,
+              stream=False):
         if self._cypher or self._transaction:
             types = {
                 "node": Node,
@@ -200,6 +283,16 @@ class GraphDatabase(object):
                 "position": Position,
             }
             tx = Transaction.get_transaction(tx)
+            if stream:
+                if tx is not None:
+                    raise CypherException("Streaming is not supported "
+                                          "inside transactions")
+                transaction = None
+                if self.VERSION and self.VERSION.split(".")[0] >= "2":
+                    transaction = self._transaction
+                return QueryStream(self._cypher, self._auth, q=q,
+                                   params=params, types=types,
+                                   returns=returns, transaction=transaction)
             # The non transactional Cypher endpoint will be removed eventually,
             # So we create always a transaction per query for Neo4j 2.0+
             if (tx is None
@@ -547,15 +640,21 @@ class Transaction(object):
     Transaction class.
     """
 
-    def __init__(self, cls, transaction_id, context, commit=True, update=True):
+    def __init__(self, cls, transaction_id, context, commit=True, update=True,
+                 max_operations=None, max_bytes=None):
         self._class = cls
         self.url = self._class._batch
         self.id = transaction_id
         self.context = context
         self.auto_commit = commit
         self.auto_update = update
+        # Limits to split the operations in several batches
+        self.max_operations = max_operations
+        self.max_bytes = max_bytes
         self.operations = []
         self.references = []
+        # Operations indexed by method and URL, to merge PUT operations
+        self._operations_index = {}
         self._value = None
         self._attribute = None
 
@@ -602,27 +701,107 @@ class Transaction(object):
                 result_dict[result_id] = result
         return result_dict
 
+    def _chunks(self, request, operations=None):
+        """
+        Split the operations in batches of at most max_operations operations
+        and max_bytes bytes once encoded.
+        """
+        if operations is None:
+            operations = self.operations
+        if not self.max_operations and not self.max_bytes:
+            yield operations
+            return
+        chunk = []
+        chunk_bytes = 2
+        for operation in operations:
+            operation_bytes = 0
+            if self.max_bytes:
+                operation_bytes = len(request._json_encode(
+                    operation, ensure_ascii=True)) + 2
+            if chunk and (
+                    (self.max_operations
+                     and len(chunk) >= self.max_operations)
+                    or (self.max_bytes
+                        and chunk_bytes + operation_bytes > self.max_bytes)):
+                yield chunk
+                chunk = []
+                chunk_bytes = 2
+            chunk.append(operation)
+            chunk_bytes += operation_bytes
+        if chunk:
+            yield chunk
+
+    def _resolve_references(self, operations, results):
+        """
+        Replace references to jobs sent in previous batches, like {3}, with
+        the URL of the element they returned.
+        """
+        def get_location(match):
+            result = results.get(int(match.group(1)), None)
+            if result is not None:
+                body = result.get("body", None)
+                if "location" in result:
+                    return result["location"]
+                elif isinstance(body, dict) and "self" in body:
+                    return body["self"]
+            return match.group(0)
+
+        def resolve(value):
+            if isinstance(value, string_types):
+                return BATCH_REFERENCE.sub(get_location, value)
+            elif isinstance(value, dict):
+                return dict((k, resolve(v)) for k, v in value.items())
+            elif isinstance(value, (list, tuple)):
+                return [resolve(v) for v in value]
+            else:
+                return value
+
+        resolved_operations = []
+        for operation in operations:
+            resolved_operation = resolve(dict(operation))
+            url_to = resolved_operation["to"]
+            if url_to.startswith(self._class.url):
+                url_to = "/%s" % url_to.replace(self._class.url, "")
+                resolved_operation["to"] = url_to
+            resolved_operations.append(resolved_operation)
+        return resolved_operations
+
     def _batch(self):
         request = Request(**self._class._auth)
-        response = request.post(self.url, data=self.operations)
-        if response.status_code == 200:
-            results_list = response.json()
-            results_dict = self._results_list_to_dict(results_list)
-            return results_dict
-        else:
-            raise TransactionException(response.status_code)
+        results_dict = {}
+        for operations in self._chunks(request):
+            if results_dict:
+                operations = self._resolve_references(operations,
+                                                      results_dict)
+            response = request.post(self.url, data=operations)
+            if response.status_code == 200:
+                results_list = response.json()
+                results_dict.update(self._results_list_to_dict(results_list))
+            elif results_dict:
+                # Previous batches were already executed and can't be undone
+                raise PartialTransactionException(
+                    response.status_code,
+                    "%s operations were already committed in previous "
+                    "batches" % len(results_dict),
+                    committed=results_dict)
+            else:
+                raise TransactionException(response.status_code)
+        return results_dict
 
     def commit(self, *args, **kwargs):
         auth = self._class._auth
         self._class.flush()
         results = self._batch()
+        # Objects changed in the server
+        on_objects = []
+        for operation in self.operations:
+            on_object = operation.get_object()
+            if isinstance(on_object, Base):
+                on_object._invalidate()
+                on_objects.append(on_object)
         # Objects to update
         if self.auto_update:
-            for operation in self.operations:
-                on_object = operation.get_object()
-                if hasattr(on_object, "update"):
-                    on_object.update(extensions=False,
-                                     delete_on_not_found=True)
+            self._refresh(on_objects)
         # Objects to return
         for referenced_object in self.references:
                 ref_object = referenced_object()
@@ -650,6 +829,7 @@ class Transaction(object):
                         ref_object.change(cls, url, data=result, auth=auth)
         self.references = []
         self.operations = []
+        self._operations_index = {}
         # Destroy the object after commit
         self = None
         if "type" in kwargs and isinstance(kwargs["type"], Exception):
@@ -657,14 +837,62 @@ class Transaction(object):
         else:
             return True
 
-    def append(self, method, url, data=None, obj=None, returns=None, of=None):
-        job_id = len(self.operations)
+    def _refresh(self, objects):
+        """
+        Update the objects modified by the transaction using just one batch
+        of GET operations (or one per chunk if the transaction is split).
+        """
+        deleted_urls = set([operation()["to"]
+                            for operation in self.operations
+                            if operation()["method"] == TX_DELETE])
+        objects_by_url = {}
+        for on_object in objects:
+            if not on_object.url or on_object._lazy:
+                # Lazy objects will be requested on their first access
+                continue
+            url_to = self._get_url_to(on_object.url)
+            if url_to in deleted_urls:
+                on_object._invalidate(forget=True)
+                on_object.url = None
+                on_object._dic = {}
+            else:
+                objects_by_url.setdefault(url_to, []).append(on_object)
+        if not objects_by_url:
+            return
+        urls = list(objects_by_url.keys())
+        operations = [{"method": TX_GET, "to": url_to, "id": job_id}
+                      for job_id, url_to in enumerate(urls)]
+        request = Request(**self._class._auth)
+        results = []
+        for chunk in self._chunks(request, operations):
+            response = request.post(self.url, data=chunk)
+            if response.status_code != 200:
+                results = None
+                break
+            results.extend(response.json())
+        if results is None:
+            # Some of the objects could not be retrieved, one by one then
+            for on_objects in objects_by_url.values():
+                for on_object in on_objects:
+                    on_object.update(extensions=False,
+                                     delete_on_not_found=True)
+            return
+        for result in results:
+            for on_object in objects_by_url[urls[result["id"]]]:
+                on_object._update_dict = result["body"]
+                on_object.update(extensions=False)
+
+    def _get_url_to(self, url):
         if url.startswith("{"):
-            url_to = url
+            return url
         elif not url.startswith("/"):
-            url_to = "/%s" % url.replace(self._class.url, "")
+            return "/%s" % url.replace(self._class.url, "")
         else:
-            url_to = url
+            return url
+
+    def append(self, method, url, data=None, obj=None, returns=None, of=None):
+        job_id = len(self.operations)
+        url_to = self._get_url_to(url)
         params = {
             "method": method,
             "to": url_to,
@@ -675,23 +903,23 @@ class Transaction(object):
             params.update({"body": data})
         # Reunify PUT methods in just one
         transaction_operation = None
+        operation_key = (method, url_to)
         if method == TX_PUT:
-            # TODO: Improve the performance of this search
-            for i, operation in enumerate(self.operations):
-                if (operation()["method"] == params["method"] == TX_PUT
-                        and operation()["to"] == params["to"]):
-                    if "body" in operation():
-                        self.operations[i]()["body"].update(params["body"])
-                    else:
-                        self.operations[i]()["body"] = params["body"]
-                    transaction_operation = operation
-                    break
+            operation = self._operations_index.get(operation_key, None)
+            if operation is not None:
+                if "body" in operation:
+                    dict.__getitem__(operation, "body").update(params["body"])
+                else:
+                    dict.__setitem__(operation, "body", params["body"])
+                transaction_operation = operation
         if not transaction_operation:
             transaction_operation = TransactionOperationProxy(obj=obj,
                                                               job=job_id,
                                                               typ=returns,
                                                               **params)
             self.operations.append(transaction_operation)
+            if method == TX_PUT:
+                self._operations_index[operation_key] = transaction_operation
             if method in (TX_POST, TX_GET, TX_DELETE):
                 self.references.append(weakref.ref(transaction_operation))
         return transaction_operation
@@ -714,13 +942,41 @@ class Base(object):
     Base class.
     """
 
+    def __new__(cls, url=None, *args, **kwargs):
+        # Identity map, the same instance is returned for the same URL
+        cache = (kwargs.get("auth", None) or {}).get("entity_cache", None)
+        if cache is not None and url and not kwargs.get("create", False):
+            obj = cache.get_object(cls, url)
+            if obj is not None:
+                return obj
+        return super(Base, cls).__new__(cls)
+
     def __init__(self, url, create=False, data={}, update_dict={}, auth=None,
-                 cypher=None):
+                 cypher=None, lazy=None):
+        if lazy is None:
+            lazy = options.LAZY_LOADING
+        cache = (auth or {}).get("entity_cache", None)
+        if cache is not None and not create and "_dic_data" in self.__dict__:
+            # Instance taken from the identity map
+            if update_dict:
+                self._update_dict = update_dict
+                self.update()
+            elif not self._lazy and cache.get(self.url) is None:
+                if lazy:
+                    self._lazy = True
+                else:
+                    self.update()
+            return
+        self._lazy = False
         self._dic = {}
         self._auth = auth or {}
         self._cypher = cypher
         self.url = None
         self._labels = None
+        cached_dict = None
+        if cache is not None and not create and not update_dict:
+            cached_dict = cache.get(url)
+            update_dict = cached_dict or {}
         # Allow update an object using only a new data dict of properties
         self._update_dict = update_dict
         if url.endswith("/"):
@@ -734,11 +990,57 @@ class Base(object):
                     "location",
                     response.headers.get("content-location")
                 )
+                # The representation is not requested again, since reads
+                # might go to a replica without the element yet
+                try:
+                    update_dict = response.json()
+                except ValueError:
+                    update_dict = {}
+                if isinstance(update_dict, dict) and "self" in update_dict:
+                    self._update_dict = update_dict
+                else:
+                    update_dict = {}
             else:
                 raise NotFoundError(response.status_code, "Invalid data sent")
         if not self.url:
             self.url = url
-        self.update()
+        if lazy and not create and not update_dict:
+            # Just a handle by URL, the object is fetched on first access
+            self._lazy = True
+        else:
+            self._update(store=cached_dict is None)
+        if cache is not None:
+            cache.add_object(self)
+
+    def __getattr__(self, attr):
+        # Attributes set by update(), like extensions, for lazy objects
+        if self.__dict__.get("_lazy", False) and not attr.startswith("__"):
+            self._hydrate()
+            if attr in self.__dict__:
+                return self.__dict__[attr]
+        raise AttributeError("'%s' object has no attribute '%s'"
+                             % (self.__class__.__name__, attr))
+
+    def _hydrate(self, update_dict=None):
+        if self.__dict__.get("_lazy", False):
+            self._lazy = False
+            if update_dict:
+                self._update_dict = update_dict
+            try:
+                self.update()
+            except Exception:
+                # Still lazy, so it's requested again the next time
+                self._lazy = True
+                raise
+
+    def _get_dic(self):
+        self._hydrate()
+        return self.__dict__.get("_dic_data")
+
+    def _set_dic(self, value):
+        self._lazy = False
+        self.__dict__["_dic_data"] = value
+    _dic = property(_get_dic, _set_dic)
 
     def _update_dict_data(self):
         if "data" in self._dic:
@@ -751,22 +1053,15 @@ class Base(object):
         if options.SMART_DATES:
             if isinstance(s, (datetime, date, time)):
                 return s
-            else:
-                try:
-                    dt = datetime.strptime(s, options.DATETIME_FORMAT)
-                except ValueError:
-                    for date_type in ["date", "time"]:
-                        try:
-                            option = "%s_FORMAT" % date_type.upper()
-                            format = getattr(options, option)
-                            t = getattr(datetime.strptime(s, format),
-                                        date_type)()
-                        except ValueError:
-                            pass
-                        else:
-                            return t
-                else:
+            elif isinstance(s, string_types):
+                dt = parse_date(s, options.DATETIME_FORMAT)
+                if dt is not None:
                     return dt
+                for date_type in ["date", "time"]:
+                    option = "%s_FORMAT" % date_type.upper()
+                    dt = parse_date(s, getattr(options, option))
+                    if dt is not None:
+                        return getattr(dt, date_type)()
         if isinstance(s, text_type):
             return s
         if isinstance(s, string_types):
@@ -779,6 +1074,10 @@ class Base(object):
             return s
 
     def update(self, extensions=True, delete_on_not_found=False):
+        self._update(extensions=extensions,
+                     delete_on_not_found=delete_on_not_found)
+
+    def _update(self, extensions=True, delete_on_not_found=False, store=True):
         if self._update_dict:
             update_dict = self._update_dict
             status = 200
@@ -794,7 +1093,11 @@ class Base(object):
                     self.extensions = ExtensionsProxy(self._extensions,
                                                       auth=self._auth)
             self._update_dict = {}
+            cache = self._auth.get("entity_cache", None)
+            if cache is not None and store:
+                cache.set(self.url, update_dict)
         elif delete_on_not_found and status == 404:
+            self._invalidate(forget=True)
             self.url = None
             self._dic = {}
             self = None
@@ -802,6 +1105,11 @@ class Base(object):
         else:
             raise NotFoundError(response.status_code, "Unable get object")
 
+    def _invalidate(self, forget=False):
+        cache = self._auth.get("entity_cache", None)
+        if cache is not None and self.url:
+            cache.invalidate(self.url, forget=forget)
+
     def delete(self, key=None, tx=None):
         if key:
             return self.__delitem__(key, tx=tx)
@@ -810,6 +1118,7 @@ class Base(object):
             return tx.append(TX_DELETE, self.url, obj=self)
         response = Request(**self._auth).delete(self.url)
         if response.status_code == 204:
+            self._invalidate(forget=True)
             self.url = None
             self._dic = None
             self = None
@@ -880,6 +1189,7 @@ class Base(object):
                                  obj=self)
             response = Request(**self._auth).put(property_url, data=value)
             if response.status_code == 204:
+                self._invalidate()
                 if options.SMART_DATES:
                     self._dic["data"].update({key: Base._safe_string(value)})
                 else:
@@ -908,6 +1218,7 @@ class Base(object):
             return tx.append(TX_DELETE, property_url, obj=self)
         response = Request(**self._auth).delete(property_url)
         if response.status_code == 204:
+            self._invalidate()
             del self._dic["data"][key]
         elif response.status_code == 404:
             if options.SMART_ERRORS:
@@ -976,6 +1287,7 @@ class Base(object):
         properties_url = self._dic["properties"]
         response = Request(**self._auth).put(properties_url, data=props)
         if response.status_code == 204:
+            self._invalidate()
             self._dic["data"] = props.copy()
             self._update_dict_data()
             return props
@@ -993,6 +1305,7 @@ class Base(object):
         properties_url = self._dic["properties"]
         response = Request(**self._auth).delete(properties_url)
         if response.status_code == 204:
+            self._invalidate()
             self._dic["data"] = {}
         else:
             raise NotFoundError(response.status_code, "Properties not found")
@@ -1007,12 +1320,14 @@ class NodesProxy(dict):
     """
 
     def __init__(self, node, reference_node=None, node_index=None, auth=None,
-                 cypher=None):
+                 cypher=None, transaction=None):
         self._node = node
         self._reference_node = reference_node
         self._node_index = node_index
         self._auth = auth or {}
         self._cypher = cypher
+        self._transaction = transaction
+        self._indexes_proxy = None
 
     def __call__(self, **kwargs):
         tx = Transaction.get_transaction(kwargs.get("tx", None))
@@ -1040,7 +1355,11 @@ class NodesProxy(dict):
     def get(self, key, *args, **kwargs):
         tx = Transaction.get_transaction(kwargs.get("tx", None))
         try:
-            return self.__getitem__(key, tx=tx)
+            element = self.__getitem__(key, tx=tx)
+            if isinstance(element, Base):
+                # Lazy elements must exist to be returned instead of default
+                element._hydrate()
+            return element
         except (KeyError, NotFoundError, StatusException):
             if args:
                 return args[0]
@@ -1062,6 +1381,45 @@ class NodesProxy(dict):
             return Node(self._node, create=True, data=kwargs, auth=self._auth,
                         cypher=self._cypher)
 
+    def get_many(self, ids, missing=MISSING_SKIP, chunk_size=1000):
+        """
+        Return the nodes with the ids in the same order, requesting them
+        with a Cypher query for every chunk of chunk_size ids, except the
+        ones in the entity cache. Nodes not found are skipped if missing
+        is "skip", returned as None if "none", or raise a NotFoundError if
+        "raise".
+        """
+        return _get_many(Node, self._node, ids, missing, chunk_size,
+                         self._auth, self._cypher, self._transaction)
+
+    def create_many(self, properties, labels=None, chunk_size=1000):
+        """
+        Create a node for every dict in properties, an iterable, with the
+        labels in labels. Nodes are created by an UNWIND Cypher statement
+        for every chunk of chunk_size nodes, each one committed in its own
+        transaction, so the chunks sent before an error are kept.
+
+        Returns lazy nodes, whose ids are known without more requests.
+        """
+        if not self._transaction:
+            raise CypherException("Creating many nodes needs the "
+                                  "transactional endpoint of Neo4j 2.1+")
+        if isinstance(labels, string_types):
+            labels = [labels]
+        node_labels = u"".join(u":`%s`" % label.replace("`", "\\`")
+                               for label in labels or [])
+        q = (u"UNWIND {rows} AS r CREATE (n%s) SET n = r RETURN id(n)"
+             % node_labels)
+        nodes = []
+        for chunk in _chunks(properties, chunk_size):
+            rows, stats = _commit_statement(q, {"rows": chunk}, self._auth,
+                                            self._transaction)
+            for row in rows:
+                nodes.append(Node(u"%s/%s" % (self._node, row[0]),
+                                  auth=self._auth, cypher=self._cypher,
+                                  lazy=True))
+        return nodes
+
     def delete(self, key, tx=None):
         tx = Transaction.get_transaction(tx)
         if tx:
@@ -1078,9 +1436,11 @@ class NodesProxy(dict):
         return self.filter()
 
     def _indexes(self):
-        if self._node_index:
-            return IndexesProxy(self._node_index, NODE, auth=self._auth,
-                                cypher=self._cypher)
+        if self._node_index and self._indexes_proxy is None:
+            self._indexes_proxy = IndexesProxy(self._node_index, NODE,
+                                               auth=self._auth,
+                                               cypher=self._cypher)
+        return self._indexes_proxy
     indexes = property(_indexes)
 
 
@@ -1093,6 +1453,11 @@ class Node(Base):
         """
         HACK: Allow to set node relationship
         """
+        if self.__dict__.get("_lazy", False):
+            try:
+                return super(Node, self).__getattr__(*args, **kwargs)
+            except AttributeError:
+                pass
         warnings.warn("Deprecated, in favor of pythonic style to declare "
                       "relationships: n2.relationships.create(rel_name, n2). "
                       "This is needed in order to handle pickling in nodes.",
@@ -1184,6 +1549,51 @@ class Node(Base):
                  uniqueness=None, is_stop_node=None, is_returnable=None,
                  paginated=False, page_size=None, time_out=None,
                  returns=None):
+        data = self._get_traverse_data(types=types, order=order, stop=stop,
+                                       returnable=returnable,
+                                       uniqueness=uniqueness)
+        if returns not in (NODE, RELATIONSHIP, PATH, POSITION):
+            returns = NODE
+        if ((paginated or page_size or time_out)
+                and "paged_traverse" in self._dic):
+            traverse_url = self._get_paged_traverse_url(returns, page_size,
+                                                        time_out)
+            return PaginatedTraversal(traverse_url, returns, data=data,
+                                      auth=self._auth, cypher=self._cypher)
+        else:
+            traverse_url = self._dic["traverse"].replace("{returnType}",
+                                                         returns)
+            # Traversals don't change the graph, so they can be retried
+            response = Request(**self._auth).post(traverse_url, data=data,
+                                                  idempotent=True)
+            if response.status_code == 200:
+                results_list = response.json()
+                if returns == NODE:
+                    return Iterable(Node, results_list, "self",
+                                    auth=self._auth, cypher=self._cypher)
+                elif returns == RELATIONSHIP:
+                    return Iterable(Relationship, results_list, "self",
+                                    auth=self._auth)
+                elif returns == PATH:
+                    return Iterable(Path, results_list, auth=self._auth)
+                elif returns == POSITION:
+                    return Iterable(Position, results_list, auth=self._auth)
+            elif response.status_code == 404:
+                raise NotFoundError(
+                    response.status_code,
+                    "Node or relationship not found"
+                )
+            else:
+                msg = "Invalid data sent"
+                try:
+                    msg += ": " + response.json().get('message')
+                except (ValueError, AttributeError, KeyError):
+                    pass
+                raise StatusException(response.status_code, msg)
+
+    @staticmethod
+    def _get_traverse_data(types=None, order=None, stop=None,
+                           returnable=None, uniqueness=None):
         data = {}
         if order in (BREADTH_FIRST, DEPTH_FIRST):
             data.update({"order": order})
@@ -1225,51 +1635,20 @@ class Node(Base):
                                           "direction": relationship.direction})
             if relationships:
                 data.update({"relationships": relationships})
-        if returns not in (NODE, RELATIONSHIP, PATH, POSITION):
-            returns = NODE
-        if ((paginated or page_size or time_out)
-                and "paged_traverse" in self._dic):
-            traverse_params = []
-            if page_size:
-                traverse_params.append("pageSize=%s" % page_size)
-            if time_out is not None:
-                traverse_params.append("leaseTime=%d" % time_out)
-            traverse_url = self._dic["paged_traverse"].replace("{returnType}",
-                                                               returns)
-            traverse_url = traverse_url.replace("{?pageSize,leaseTime}", "")
-            if traverse_params:
-                traverse_url = "%s?%s" % (traverse_url,
-                                          "&".join(traverse_params))
-            return PaginatedTraversal(traverse_url, returns, data=data,
-                                      auth=self._auth, cypher=self._cypher)
-        else:
-            traverse_url = self._dic["traverse"].replace("{returnType}",
-                                                         returns)
-            response = Request(**self._auth).post(traverse_url, data=data)
-            if response.status_code == 200:
-                results_list = response.json()
-                if returns == NODE:
-                    return Iterable(Node, results_list, "self",
-                                    auth=self._auth, cypher=self._cypher)
-                elif returns == RELATIONSHIP:
-                    return Iterable(Relationship, results_list, "self",
-                                    auth=self._auth)
-                elif returns == PATH:
-                    return Iterable(Path, results_list, auth=self._auth)
-                elif returns == POSITION:
-                    return Iterable(Position, results_list, auth=self._auth)
-            elif response.status_code == 404:
-                raise NotFoundError(
-                    response.status_code,
-                    "Node or relationship not found"
-                )
-            else:
-                msg = "Invalid data sent"
-                try:
-                    msg += ": " + response.json().get('message')
-                except (ValueError, AttributeError, KeyError):
-                    pass
-                raise StatusException(response.status_code, msg)
+        return data
+
+    def _get_paged_traverse_url(self, returns, page_size=None, time_out=None):
+        traverse_params = []
+        if page_size:
+            traverse_params.append("pageSize=%s" % page_size)
+        if time_out is not None:
+            traverse_params.append("leaseTime=%d" % time_out)
+        traverse_url = self._dic["paged_traverse"].replace("{returnType}",
+                                                           returns)
+        traverse_url = traverse_url.replace("{?pageSize,leaseTime}", "")
+        if traverse_params:
+            traverse_url = "%s?%s" % (traverse_url, "&".join(traverse_params))
+        return traverse_url
 
     def _set_labels(self, labels):
         if not isinstance(labels, (tuple, list)):
@@ -1349,6 +1728,10 @@ class PaginatedTraversal(object):
 class IndexesProxy(dict):
     """
     Class proxy for indexes (nodes and relationships).
+
+    The list of indexes is requested on the first access and kept until
+    refresh() or invalidate() are called. Indexes created or deleted through
+    the proxy are updated in place.
     """
 
     def __init__(self, index_url, index_for=NODE, auth=None, cypher=None):
@@ -1356,7 +1739,27 @@ class IndexesProxy(dict):
         self._cypher = cypher
         self.url = index_url
         self._index_for = index_for
-        self._dict = self._get_dict()
+        self._dict_cache = None
+
+    def _get_cached_dict(self):
+        if self._dict_cache is None:
+            self._dict_cache = self._get_dict()
+        return self._dict_cache
+    _dict = property(_get_cached_dict)
+
+    def refresh(self):
+        self._dict_cache = self._get_dict()
+        return self
+
+    def invalidate(self, name=None):
+        """
+        Remove the index name from the list, or the whole list if name is
+        None, so it is requested again on the next access.
+        """
+        if name is None:
+            self._dict_cache = None
+        elif self._dict_cache is not None:
+            self._dict_cache.pop(name, None)
 
     def __getitem__(self, attr):
         return self._dict[attr]
@@ -1382,6 +1785,7 @@ class IndexesProxy(dict):
                 indexes_dict[index_name] = Index(self._index_for, index_name,
                                                  auth=self._auth,
                                                  cypher=self._cypher,
+                                                 indexes=self,
                                                  **index_props)
             return indexes_dict
         elif response.status_code == 404:
@@ -1412,6 +1816,8 @@ class IndexesProxy(dict):
             else:
                 op = tx.append(TX_POST, url, data=data, obj=self,
                                returns=INDEX_RELATIONSHIP)
+            # The index will be available after the commit
+            self.invalidate()
             return op
         else:
             if name not in self._dict:
@@ -1424,6 +1830,7 @@ class IndexesProxy(dict):
                     self._dict[name] = Index(self._index_for, name,
                                              auth=self._auth,
                                              cypher=self._cypher,
+                                             indexes=self,
                                              **result_dict)
                 else:
                     msg = "Invalid data sent"
@@ -1591,10 +1998,13 @@ class Index(object):
                                       "Error requesting index with GET %s"
                                       % url)
 
-    def __init__(self, index_for, name, auth=None, cypher=None, **kwargs):
+    def __init__(self, index_for, name, auth=None, cypher=None, indexes=None,
+                 **kwargs):
         self._auth = auth or {}
         self._cypher = cypher
         self._index_for = index_for
+        # IndexesProxy to update when the index is deleted
+        self._indexes = indexes
         self.name = name
         self.template = kwargs.get("template")
         self.provider = kwargs.get("provider")
@@ -1745,6 +2155,7 @@ class Index(object):
     def delete(self, key=None, value=None, item=None, tx=None):
         if not key and not value and not item:
             url = self.template.replace("/{key}/{value}", "")
+            request_url = "index/%s/%s" % (self._index_for, self.name)
         else:
             if not isinstance(item, Base):
                 raise TypeError("%s has no url attribute" % item)
@@ -1771,18 +2182,24 @@ class Index(object):
                 raise TypeError("delete() takes at least 1 argument, the "
                                 "%s to remove" % self._index_for)
         tx = Transaction.get_transaction(tx)
+        delete_index = not key and not value and not item
         if tx:
+            if delete_index and self._indexes is not None:
+                self._indexes.invalidate()
             return tx.append(TX_DELETE, request_url, obj=self)
         else:
             response = Request(**self._auth).delete(url)
-            if response.status_code == 404:
+            if response.status_code == 204:
+                if delete_index and self._indexes is not None:
+                    self._indexes.invalidate(self.name)
+            elif response.status_code == 404:
                 if options.SMART_ERRORS:
                     raise KeyError(self._index_for.capitalize())
                 else:
                     index_for = self._index_for.capitalize()
                     raise NotFoundError(response.status_code,
                                         "%s not found" % index_for)
-            elif response.status_code != 204:
+            else:
                 raise StatusException(response.status_code)
 
     def query(self, *args):
@@ -1864,11 +2281,13 @@ class RelationshipsProxy(dict):
     """
 
     def __init__(self, relationship, relationship_index, auth=None,
-                 cypher=None):
+                 cypher=None, transaction=None):
         self._auth = auth or {}
         self._cypher = cypher
+        self._transaction = transaction
         self._relationship = relationship
         self._relationship_index = relationship_index
+        self._indexes_proxy = None
 
     def __getitem__(self, key, tx=None):
         tx = Transaction.get_transaction(tx)
@@ -1882,7 +2301,11 @@ class RelationshipsProxy(dict):
     def get(self, key, *args, **kwargs):
         tx = Transaction.get_transaction(kwargs.get("tx", None))
         try:
-            return self.__getitem__(key, tx=tx)
+            element = self.__getitem__(key, tx=tx)
+            if isinstance(element, Base):
+                # Lazy elements must exist to be returned instead of default
+                element._hydrate()
+            return element
         except (KeyError, NotFoundError, StatusException):
             if args:
                 return args[0]
@@ -1894,6 +2317,75 @@ class RelationshipsProxy(dict):
     def create(self, node_from, relationship_name, node_to, **kwargs):
         return getattr(node_from, relationship_name)(node_to, **kwargs)
 
+    def get_many(self, ids, missing=MISSING_SKIP, chunk_size=1000):
+        """
+        Return the relationships with the ids in the same order, like
+        NodesProxy.get_many.
+        """
+        return _get_many(Relationship, self._relationship, ids, missing,
+                         chunk_size, self._auth, self._cypher,
+                         self._transaction)
+
+    def create_many(self, rows, type, merge=False, chunk_size=1000,
+                    on_chunk=None):
+        """
+        Create a relationship of type type for every tuple of start node,
+        end node and, optionally, a dict of properties in rows. Nodes can be
+        given by id, as Node objects, or as tuples of label, key and value
+        to look them up. Relationships are created by an UNWIND Cypher
+        statement for every chunk of chunk_size rows with nodes given the
+        same way, each one committed in its own transaction.
+
+        If merge is True, existing relationships between the nodes are
+        updated instead of created again. on_chunk is called once for every
+        chunk with the statistics of the changes made by all its statements.
+
+        Lookups by label, key and value must match a single node, or a
+        ValueError is raised and the changes of the chunk are rolled back.
+
+        Returns lazy relationships in the order of rows, or None for the
+        rows with nodes not found.
+        """
+        if not self._transaction:
+            raise CypherException("Creating many relationships needs the "
+                                  "transactional endpoint of Neo4j 2.1+")
+        queries = {}
+        relationships = []
+        # Grouped by chunk, so rows can be generated while they're sent
+        for chunk in _chunks(enumerate(rows), chunk_size):
+            relationships.extend([None] * len(chunk))
+            chunk_stats = {}
+            rows_by_match = collections.OrderedDict()
+            for i, row in chunk:
+                start, match_start = _get_node_match(row[0])
+                end, match_end = _get_node_match(row[1])
+                properties = row[2] if len(row) > 2 else {}
+                rows_by_match.setdefault((match_start, match_end), []).append({
+                    "i": i,
+                    "start": start,
+                    "end": end,
+                    "properties": properties or {},
+                })
+            for match, match_rows in rows_by_match.items():
+                if match not in queries:
+                    queries[match] = _get_create_relationships_query(
+                        match[0], match[1], type, merge)
+                check = None
+                if match != (None, None):
+                    # Lookups matching several nodes are rolled back
+                    check = _check_unique_rows
+                results, stats = _commit_statement(
+                    queries[match], {"rows": match_rows}, self._auth,
+                    self._transaction, check=check)
+                for i, relationship_id in results:
+                    relationships[i] = Relationship(
+                        u"%s/%s" % (self._relationship, relationship_id),
+                        auth=self._auth, lazy=True)
+                _add_stats(chunk_stats, stats)
+            if on_chunk is not None:
+                on_chunk(chunk_stats)
+        return relationships
+
     def delete(self, key, tx=None):
         tx = Transaction.get_transaction(tx)
         if tx:
@@ -1910,9 +2402,11 @@ class RelationshipsProxy(dict):
         return self.filter()
 
     def _indexes(self):
-        if self._relationship_index:
-            return IndexesProxy(self._relationship_index, RELATIONSHIP,
-                                auth=self._auth, cypher=self._cypher)
+        if self._relationship_index and self._indexes_proxy is None:
+            self._indexes_proxy = IndexesProxy(self._relationship_index,
+                                               RELATIONSHIP, auth=self._auth,
+                                               cypher=self._cypher)
+        return self._indexes_proxy
     indexes = property(_indexes)
 
 
@@ -2029,6 +2523,9 @@ class Relationship(Base):
 class Path(object):
     """
     Path class for return type PATH in traversals.
+
+    Nodes and relationships of the path are lazy, they are requested on
+    their first access or all at once by calling hydrate().
     """
 
     def __init__(self, dic, auth=None, cypher=None):
@@ -2039,22 +2536,38 @@ class Path(object):
         self._nodes = []
         self._relationships = []
         self._iterable = []
-        self._start = Node(self._dic["start"], auth=self._auth,
-                           cypher=self._cypher)
-        self._end = Node(self._dic["end"], auth=self._auth,
-                         cypher=self._cypher)
+        # Elements by URL, so the same element is not requested twice
+        self._elements = {}
+        self._start = self._get_element(Node, self._dic["start"])
+        self._end = self._get_element(Node, self._dic["end"])
         for i in range(0, len(dic["relationships"])):
-            node = Node(dic["nodes"][i], auth=self._auth, cypher=self._cypher)
+            node = self._get_element(Node, dic["nodes"][i])
             self._nodes.append(node)
-            relationship = Relationship(dic["relationships"][i],
-                                        auth=self._auth)
+            relationship = self._get_element(Relationship,
+                                             dic["relationships"][i])
             self._relationships.append(relationship)
             self._iterable.append(node)
             self._iterable.append(relationship)
-        node = Node(dic["nodes"][-1], auth=self._auth, cypher=self._cypher)
+        node = self._get_element(Node, dic["nodes"][-1])
         self._nodes.append(node)
         self._iterable.append(node)
 
+    def _get_element(self, cls, url):
+        if url is None:
+            return None
+        if url not in self._elements:
+            self._elements[url] = cls(url, auth=self._auth,
+                                      cypher=self._cypher, lazy=True)
+        return self._elements[url]
+
+    def hydrate(self):
+        """
+        Request all the elements of the path not requested yet using just
+        one batch request.
+        """
+        _hydrate_elements(self._elements.values(), self._auth)
+        return self
+
     def __len__(self):
         return self._length
 
@@ -2089,18 +2602,31 @@ class Path(object):
 class Position(object):
     """
     Position class for return type POSITION in traversals.
+
+    As in Path, elements are lazy and can be requested at once by calling
+    hydrate().
     """
 
     def __init__(self, dic, auth=None, cypher=None, **kwargs):
         self._auth = auth or {}
         self._cypher = cypher
-        self._node = Node(dic["node"], auth=self._auth, cypher=self._cypher)
+        self._path = Path(dic["path"], auth=self._auth, cypher=self._cypher)
+        # Node and relationship are shared with the path
+        self._node = self._path._get_element(Node, dic["node"])
         self._depth = int(dic["depth"])
-        relationship = Relationship(dic.get("last relationship",
-                                    dic.get("last_relationship", None)),
-                                    auth=self._auth)
+        relationship = self._path._get_element(
+            Relationship,
+            dic.get("last relationship", dic.get("last_relationship", None))
+        )
         self._last_relationship = relationship
-        self._path = Path(dic["path"], auth=self._auth, cypher=self._cypher)
+
+    def hydrate(self):
+        """
+        Request all the elements of the position not requested yet using
+        just one batch request.
+        """
+        self._path.hydrate()
+        return self
 
     def _get_node(self):
         return self._node
@@ -2119,6 +2645,191 @@ class Position(object):
     path = property(_get_path)
 
 
+def _hydrate_elements(elements, auth):
+    """
+    Request the lazy nodes and relationships in elements using one batch
+    request for each database.
+    """
+    operations_by_batch = {}
+    for element in elements:
+        if element is None or not element.__dict__.get("_lazy", False):
+            continue
+        for element_type in (NODE, RELATIONSHIP):
+            root, sep, path = element.url.rpartition("/%s/" % element_type)
+            if sep:
+                batch_url = "%s/batch" % root
+                operations = operations_by_batch.setdefault(batch_url, [])
+                operations.append((element, "/%s/%s" % (element_type, path)))
+                break
+    request = Request(**auth)
+    for batch_url, operations in operations_by_batch.items():
+        data = [{"method": TX_GET, "to": url_to, "id": job_id}
+                for job_id, (element, url_to) in enumerate(operations)]
+        response = request.post(batch_url, data=data)
+        if response.status_code == 200:
+            for result in response.json():
+                element = operations[result["id"]][0]
+                element._hydrate(update_dict=result["body"])
+        else:
+            # Some elements could not be retrieved, one by one then
+            for element, url_to in operations:
+                element._hydrate()
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _get_node_match(node):
+    """
+    Return the value to match a node and the label and key to match it, or
+    None if it's matched by id.
+    """
+    if isinstance(node, Base):
+        return node.id, None
+    elif isinstance(node, (tuple, list)):
+        if len(node) != 3:
+            raise ValueError("Nodes must be looked up by label, key and "
+                             "value")
+        return node[2], (node[0], node[1])
+    return int(node), None
+
+
+def _get_create_relationships_query(match_start, match_end, type, merge):
+    patterns = []
+    wheres = []
+    for name, field, match in (("a", "start", match_start),
+                               ("b", "end", match_end)):
+        if match is None:
+            patterns.append(u"(%s)" % name)
+            wheres.append(u"id(%s) = r.%s" % (name, field))
+        else:
+            label, key = [part.replace("`", "\\`") for part in match]
+            patterns.append(u"(%s:`%s` {`%s`: r.%s})"
+                            % (name, label, key, field))
+    q = u"UNWIND {rows} AS r MATCH %s" % u", ".join(patterns)
+    if wheres:
+        q = u"%s WHERE %s" % (q, u" AND ".join(wheres))
+    q = u"%s %s (a)-[rel:`%s`]->(b) SET rel = r.properties" % (
+        q, u"MERGE" if merge else u"CREATE", type.replace("`", "\\`"))
+    return u"%s RETURN r.i, id(rel)" % q
+
+
+def _check_unique_rows(rows):
+    seen = set()
+    for row in rows:
+        if row[0] in seen:
+            raise ValueError("The nodes of row %s are looked up by keys "
+                             "matching more than one node" % row[0])
+        seen.add(row[0])
+
+
+def _commit_statement(q, params, auth, transaction, rest=False,
+                      check=None):
+    """
+    Run the Cypher query q in its own transaction, returning the rows of
+    the results and the statistics of the changes made. If rest is True,
+    nodes and relationships in rows are full representations. If check is
+    given, it's called with the rows before committing, and the transaction
+    is rolled back if it raises an exception.
+    """
+    contents = "rest" if rest else "row"
+    data = {
+        "statements": [{
+            "statement": q,
+            "parameters": params,
+            "includeStats": True,
+            "resultDataContents": [contents.upper() if rest else contents],
+        }],
+    }
+    request = Request(**auth)
+    if check is None:
+        response = request.post(u"%s/commit" % transaction, data=data,
+                                idempotent=is_read_query(q))
+    else:
+        response = request.post(transaction, data=data)
+    if response.status_code not in (200, 201):
+        raise TransactionException(response.status_code)
+    content = response.json()
+    QueryTransaction._manage_errors(content["errors"])
+    result = content["results"][0]
+    rows = [element[contents] for element in result["data"]]
+    if check is not None:
+        commit = content["commit"]
+        try:
+            check(rows)
+        except Exception:
+            request.delete(commit[:-len("/commit")])
+            raise
+        response = request.post(commit, data={"statements": []})
+        if response.status_code != 200:
+            raise TransactionException(response.status_code)
+        QueryTransaction._manage_errors(response.json()["errors"])
+    return rows, result.get("stats", None)
+
+
+def _add_stats(total, stats):
+    """
+    Add the statistics of the changes made by a statement to total.
+    """
+    for stat, value in (stats or {}).items():
+        if isinstance(value, bool):
+            total[stat] = total.get(stat, False) or value
+        else:
+            total[stat] = total.get(stat, 0) + value
+    return total
+
+
+def _get_many(cls, url, ids, missing, chunk_size, auth, cypher,
+              transaction):
+    """
+    Return the elements of class cls with the ids, requesting the ones not
+    in the entity cache with a Cypher query for every chunk of chunk_size.
+    """
+    if missing not in MISSING_POLICIES:
+        raise ValueError("Unknown missing policy '%s'" % missing)
+    if not transaction:
+        raise CypherException("Getting many elements needs the "
+                              "transactional endpoint of Neo4j 2.0+")
+    ids = [int(element_id) for element_id in ids]
+    cache = auth.get("entity_cache", None)
+    found = {}
+    requested = collections.OrderedDict()
+    for element_id in ids:
+        if element_id in found or element_id in requested:
+            continue
+        element_url = u"%s/%s" % (url, element_id)
+        if cache is not None and element_url in cache:
+            # Built from the cached representation by Base
+            found[element_id] = cls(element_url, auth=auth, cypher=cypher)
+        else:
+            requested[element_id] = True
+    if cls is Node:
+        q = u"MATCH (e) WHERE id(e) IN {ids} RETURN e"
+    else:
+        q = u"MATCH ()-[e]->() WHERE id(e) IN {ids} RETURN e"
+    for chunk in _chunks(requested, chunk_size):
+        rows, stats = _commit_statement(q, {"ids": chunk}, auth, transaction,
+                                        rest=True)
+        for row in rows:
+            element = cls(row[0]["self"], update_dict=row[0], auth=auth,
+                          cypher=cypher)
+            found[element.id] = element
+    not_found = [element_id for element_id in ids if element_id not in found]
+    if not_found and missing == MISSING_RAISE:
+        raise NotFoundError(404, "Elements not found: %s"
+                            % u", ".join(text_type(i) for i in not_found))
+    elements = [found.get(element_id, None) for element_id in ids]
+    if missing == MISSING_SKIP:
+        elements = [element for element in elements if element is not None]
+    return elements
+
+
 class BaseInAndOut(object):
     """
     Base class for Incoming, Outgoing and Undirected relationships types.
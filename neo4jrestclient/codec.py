@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+import datetime
+import decimal
+import json
+import operator
+import re
+import time
+
+from neo4jrestclient import options
+from neo4jrestclient.utils import string_types
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_illegal_s = re.compile(r"((^|[^%])(%%)*%s)")
+
+
+# Proleptic Gregorian dates and strftime before 1900 « Python recipes
+# ActiveState Code: http://bit.ly/9t0JKb via @addthis
+
+def _findall(text, substr):
+    # Also finds overlaps
+    sites = []
+    i = 0
+    while 1:
+        j = text.find(substr, i)
+        if j == -1:
+            break
+        sites.append(j)
+        i = j + 1
+    return sites
+
+
+# Every 28 years the calendar repeats, except through century leap
+# years where it's 6 years.  But only if you're using the Gregorian
+# calendar.  ;)
+
+def strftime(dt, fmt):
+    if _illegal_s.search(fmt):
+        raise TypeError("This strftime implementation does not handle %s")
+    if dt.year > 1900:
+        return dt.strftime(fmt)
+    year = dt.year
+    # For every non-leap year century, advance by
+    # 6 years to get into the 28-year repeat cycle
+    delta = 2000 - year
+    off = 6 * (delta // 100 + delta // 400)
+    year = year + off
+    # Move to around the year 2000
+    year = year + ((2000 - year) // 28) * 28
+    timetuple = dt.timetuple()
+    s1 = time.strftime(fmt, (year,) + timetuple[1:])
+    sites1 = _findall(s1, str(year))
+    s2 = time.strftime(fmt, (year + 28,) + timetuple[1:])
+    sites2 = _findall(s2, str(year + 28))
+    sites = []
+    for site in sites1:
+        if site in sites2:
+            sites.append(site)
+    s = s1
+    syear = "%4d" % (dt.year, )
+    for site in sites:
+        s = s[:site] + syear + s[site + 4:]
+    return s
+
+
+# Directives of strftime formats that can be formatted and parsed without
+# strftime and strptime, with their format, attribute and regular expression
+_DIRECTIVES = {
+    "Y": ("%04d", "year", r"(?P<year>\d{4})"),
+    "m": ("%02d", "month", r"(?P<month>\d{1,2})"),
+    "d": ("%02d", "day", r"(?P<day>\d{1,2})"),
+    "H": ("%02d", "hour", r"(?P<hour>\d{1,2})"),
+    "M": ("%02d", "minute", r"(?P<minute>\d{1,2})"),
+    "S": ("%02d", "second", r"(?P<second>\d{1,2})"),
+    "f": ("%06d", "microsecond", r"(?P<microsecond>\d{1,6})"),
+}
+_directive = re.compile(r"%(.)")
+_compiled_formats = {}
+
+
+def _compile_format(fmt):
+    """
+    Return a tuple of template, getter of attributes and regular expression
+    for the format, or None if it has directives not in _DIRECTIVES.
+    """
+    if fmt in _compiled_formats:
+        return _compiled_formats[fmt]
+    compiled = None
+    literals = _directive.split(fmt)
+    directives = literals[1::2]
+    if (all(directive in _DIRECTIVES for directive in directives)
+            and len(set(directives)) == len(directives)):
+        template = []
+        expression = []
+        for i, literal in enumerate(literals):
+            if i % 2:
+                template.append(_DIRECTIVES[literal][0])
+                expression.append(_DIRECTIVES[literal][2])
+            else:
+                template.append(literal)
+                expression.append(re.escape(literal))
+        attributes = [_DIRECTIVES[directive][1] for directive in directives]
+        # Getter of the tuple of values of the attributes
+        getter = operator.attrgetter(*(attributes + attributes[:1]))
+        compiled = ("".join(template), getter,
+                    re.compile("".join(expression) + r"\Z"))
+    _compiled_formats[fmt] = compiled
+    return compiled
+
+
+def format_date(value, fmt):
+    """
+    Format a datetime, date or time object like strftime, but faster for
+    formats with only year, month, day, hour, minute, second and
+    microsecond directives, and for any year.
+    """
+    compiled = _compiled_formats.get(fmt, False)
+    if compiled is False:
+        compiled = _compile_format(fmt)
+    if compiled is not None:
+        try:
+            # The last value is only there to always get a tuple
+            return compiled[0] % compiled[1](value)[:-1]
+        except AttributeError:
+            # E.g., a format with hours for a date object
+            pass
+    if isinstance(value, datetime.time):
+        return value.strftime(fmt)
+    return strftime(value, fmt)
+
+
+def parse_date(value, fmt):
+    """
+    Parse value with the format like datetime.strptime, returning None if
+    it doesn't match the format. Values that are clearly not dates are
+    discarded without calling strptime.
+    """
+    compiled = _compile_format(fmt)
+    if compiled is None:
+        try:
+            return datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            return None
+    match = compiled[2].match(value)
+    if match is None:
+        return None
+    parts = match.groupdict()
+    microsecond = parts.get("microsecond", None)
+    try:
+        return datetime.datetime(
+            int(parts.get("year", 1900)), int(parts.get("month", 1)),
+            int(parts.get("day", 1)), int(parts.get("hour", 0)),
+            int(parts.get("minute", 0)), int(parts.get("second", 0)),
+            int(microsecond.ljust(6, "0")) if microsecond else 0)
+    except ValueError:
+        # Out of range values, like month 13
+        return None
+
+
+def default(data):
+    """
+    Encode the values not supported by JSON.
+    """
+    if isinstance(data, decimal.Decimal):
+        return str(data)
+    elif isinstance(data, datetime.datetime):
+        return format_date(data, options.DATETIME_FORMAT)
+    elif isinstance(data, datetime.date):
+        return format_date(data, options.DATE_FORMAT)
+    elif isinstance(data, datetime.time):
+        return format_date(data, options.TIME_FORMAT)
+    raise TypeError("%r is not JSON serializable" % (data, ))
+
+
+def strip_none(data):
+    """
+    Return a copy of data without the keys of its dictionaries with None
+    values, since Neo4j doesn't allow 'null' properties.
+    """
+    if isinstance(data, dict):
+        return dict((k, strip_none(v)) for k, v in data.items()
+                    if v is not None)
+    elif isinstance(data, (list, tuple)):
+        return [strip_none(v) for v in data]
+    else:
+        return data
+
+
+class JSONCodec(object):
+    """
+    Encoder and decoder of the bodies of requests and responses, using the
+    json module of the standard library.
+    """
+    name = "json"
+    null = "null"
+
+    def dumps(self, data, ensure_ascii=False):
+        return json.dumps(data, default=default, ensure_ascii=ensure_ascii)
+
+    def loads(self, content):
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        return json.loads(content)
+
+    def encode(self, data, ensure_ascii=False):
+        encoded = self.dumps(data, ensure_ascii=ensure_ascii)
+        # Most of the payloads have no None values, so instead of copying
+        # every payload, only the ones with any null are encoded again
+        if self.null in encoded:
+            encoded = self.dumps(strip_none(data), ensure_ascii=ensure_ascii)
+        return encoded
+
+    def decode(self, content):
+        return self.loads(content)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    Codec using orjson. The result of encoding is UTF-8 encoded bytes.
+    """
+    name = "orjson"
+    null = b"null"
+
+    def dumps(self, data, ensure_ascii=False):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        return orjson.dumps(data, default=default, option=option)
+
+    def loads(self, content):
+        return orjson.loads(content)
+
+
+CODECS = {
+    JSONCodec.name: JSONCodec,
+    OrjsonCodec.name: OrjsonCodec,
+}
+
+_codecs = {}
+
+
+def get_codec(codec=None):
+    """
+    Return the codec for codec, that can be the name of a codec, an object
+    with the same interface as JSONCodec, or None for the fastest codec
+    available.
+    """
+    if codec is None:
+        codec = OrjsonCodec.name if orjson is not None else JSONCodec.name
+    if isinstance(codec, string_types):
+        if codec not in _codecs:
+            if codec not in CODECS:
+                raise ValueError("Unknown JSON codec '%s'" % codec)
+            if codec == OrjsonCodec.name and orjson is None:
+                raise ImportError("orjson needs to be installed in order to "
+                                  "use the 'orjson' JSON codec in "
+                                  "neo4jrestclient. \n"
+                                  "Please, run $ pip install orjson")
+            _codecs[codec] = CODECS[codec]()
+        codec = _codecs[codec]
+    return codec
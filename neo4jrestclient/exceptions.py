@@ -117,6 +117,18 @@ class TransactionException(StatusException):
         super(TransactionException, self).__init__(value, message)
 
 
+class PartialTransactionException(TransactionException):
+    """
+    Raised when a batch of a transaction split in several batches fails
+    after the previous ones were committed. committed has their results,
+    by the id of their operations.
+    """
+
+    def __init__(self, value=None, message=None, committed=None):
+        self.committed = committed or {}
+        super(PartialTransactionException, self).__init__(value, message)
+
+
 class NotFoundError(StatusException):
 
     def __init__(self, value=None, result=None):
@@ -50,7 +50,7 @@ class Iterable(list):
         #       avoiding a circular loop of imports
         # if isinstance(value, Base) and hasattr(value, "url"):
         if (hasattr(value, "url") and hasattr(value, "id")
-                and hasattr(value, "_dic")):
+                and hasattr(value.__class__, "_dic")):
             if self._attribute:
                 return value.url in [elto[self._attribute]
                                      for elto in self._list]
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+
+class LimitException(Exception):
+    pass
+
+
+class Limiter(object):
+    """
+    Limit the requests in flight to max_concurrency, and the requests
+    started per second to rate, allowing bursts of up to burst requests
+    (token bucket). Requests wait in a queue for at most timeout seconds
+    (forever if timeout is None) before raising a LimitException.
+    """
+
+    def __init__(self, max_concurrency=None, rate=None, burst=None,
+                 timeout=None):
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst or max(1, int(rate or 1))
+        self.timeout = timeout
+        self._condition = threading.Condition(threading.Lock())
+        self._tokens = float(self.burst)
+        self._updated = time.time()
+        self.in_flight = 0
+        self.waiting = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.max_waiting = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.rejected = 0
+
+    def _refill(self, now):
+        if self.rate is not None:
+            self._tokens = min(self.burst, self._tokens
+                               + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout=None):
+        """
+        Wait for a free slot and a token, returning the seconds waited.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        start = time.time()
+        waited = False
+        with self._condition:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            try:
+                while True:
+                    now = time.time()
+                    self._refill(now)
+                    full = (self.max_concurrency is not None
+                            and self.in_flight >= self.max_concurrency)
+                    if not full and (self.rate is None or self._tokens >= 1):
+                        break
+                    delay = None
+                    if not full:
+                        delay = (1 - self._tokens) / self.rate
+                    if timeout is not None:
+                        remaining = start + timeout - now
+                        # Fail fast if the token will not be there in time
+                        if remaining <= 0 or (delay is not None
+                                              and delay > remaining):
+                            self.rejected += 1
+                            raise LimitException(
+                                "Timeout waiting to send the request")
+                        if delay is None or remaining < delay:
+                            delay = remaining
+                    waited = True
+                    # Slots are notified when released, tokens are not
+                    self._condition.wait(delay)
+                if self.rate is not None:
+                    self._tokens -= 1
+                self.in_flight += 1
+            finally:
+                self.waiting -= 1
+            wait_time = time.time() - start
+            if waited:
+                self.waits += 1
+                self.wait_time += wait_time
+                self.max_wait_time = max(self.max_wait_time, wait_time)
+        return wait_time
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    @property
+    def stats(self):
+        with self._condition:
+            return {
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "waits": self.waits,
+                "wait_time": self.wait_time,
+                "max_wait_time": self.max_wait_time,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+import functools
+import os
+import re
+import threading
+import traceback
+import warnings
+
+from neo4jrestclient.utils import urlparse
+
+
+# Frames of this package, except the ones of tests, are not call sites
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_TESTS_DIR = os.path.join(_PACKAGE_DIR, "tests")
+
+# Segments of URLs replaced to group requests by endpoint
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+_INDEX_SEGMENTS = re.compile(r"(/index/(?:node|relationship)/[^/]+)/[^/]+"
+                             r"(?:/[^/]+)?")
+
+
+def get_endpoint(url):
+    """
+    Return the path of url with identifiers, and keys and values of indexes,
+    replaced by placeholders, e.g. /db/data/node/{id}/properties.
+    """
+    path = urlparse(url).path.rstrip("/") or "/"
+    path = _INDEX_SEGMENTS.sub(r"\1/{key}/{value}", path)
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+class RequestEvent(object):
+    """
+    Information about a request, passed to the pre_request hooks before
+    sending it and to the post_request hooks when finished.
+
+    Times are in seconds. connect_time is the time spent opening new
+    connections (including DNS resolution and TLS handshake), so it is 0
+    when a connection of the pool is reused. ttfb is the time until the
+    headers of the response were received. wait_time is the time spent
+    waiting in the queue of the limits of the transport.
+    """
+
+    def __init__(self, method, url, retries=0):
+        self.method = method
+        self.url = url
+        self._endpoint = None
+        self.retries = retries
+        self.status_code = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.connect_time = 0
+        self.wait_time = 0
+        self.ttfb = None
+        self.total_time = None
+        self.error = None
+
+    @property
+    def endpoint(self):
+        # Only computed if any hook needs it
+        if self._endpoint is None:
+            self._endpoint = get_endpoint(self.url)
+        return self._endpoint
+
+    def __repr__(self):
+        return "<RequestEvent: %s %s %s>" % (self.method, self.endpoint,
+                                             self.status_code)
+
+
+class Metrics(object):
+    """
+    In-memory aggregator of requests by method and endpoint, with counters
+    and latency histograms. It can be added as a post_request hook.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+               10.0)
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(sorted(buckets or self.BUCKETS))
+        self._lock = threading.Lock()
+        self._endpoints = OrderedDict()
+
+    def __call__(self, event):
+        self.add(event)
+
+    def add(self, event):
+        key = (event.method, event.endpoint)
+        with self._lock:
+            if key not in self._endpoints:
+                self._endpoints[key] = {
+                    "method": event.method,
+                    "endpoint": event.endpoint,
+                    "requests": 0,
+                    "errors": 0,
+                    "retries": 0,
+                    "statuses": {},
+                    "bytes_sent": 0,
+                    "bytes_received": 0,
+                    "connect_time": 0.0,
+                    "wait_time": 0.0,
+                    "total_time": 0.0,
+                    "buckets": [0] * len(self.buckets),
+                }
+            stats = self._endpoints[key]
+            stats["requests"] += 1
+            stats["retries"] += event.retries
+            if event.error is not None or (event.status_code or 0) >= 400:
+                stats["errors"] += 1
+            status = event.status_code
+            stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+            stats["bytes_sent"] += event.bytes_sent
+            stats["bytes_received"] += event.bytes_received
+            stats["connect_time"] += event.connect_time
+            stats["wait_time"] += event.wait_time
+            total_time = event.total_time or 0.0
+            stats["total_time"] += total_time
+            for i, bucket in enumerate(self.buckets):
+                if total_time <= bucket:
+                    stats["buckets"][i] += 1
+                    break
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def summary(self):
+        """
+        Return the statistics of every endpoint, the most expensive first.
+        """
+        with self._lock:
+            endpoints = [dict(stats, statuses=dict(stats["statuses"]),
+                              buckets=list(stats["buckets"]))
+                         for stats in self._endpoints.values()]
+        return sorted(endpoints, key=lambda stats: -stats["total_time"])
+
+    def to_prometheus(self, prefix="neo4jrestclient"):
+        """
+        Return the metrics in the text exposition format of Prometheus.
+        """
+        lines = []
+        metric = "%s_request_duration_seconds" % prefix
+        lines.append("# TYPE %s histogram" % metric)
+        for stats in self.summary():
+            labels = u'method="%s",endpoint="%s"' % (
+                stats["method"], stats["endpoint"].replace('"', '\\"'))
+            count = 0
+            for bucket, bucket_count in zip(self.buckets, stats["buckets"]):
+                count += bucket_count
+                lines.append(u'%s_bucket{%s,le="%s"} %d'
+                             % (metric, labels, bucket, count))
+            lines.append(u'%s_bucket{%s,le="+Inf"} %d'
+                         % (metric, labels, stats["requests"]))
+            lines.append(u"%s_sum{%s} %f"
+                         % (metric, labels, stats["total_time"]))
+            lines.append(u"%s_count{%s} %d"
+                         % (metric, labels, stats["requests"]))
+        for name, key in (("requests_total", "requests"),
+                          ("errors_total", "errors"),
+                          ("retries_total", "retries"),
+                          ("sent_bytes_total", "bytes_sent"),
+                          ("received_bytes_total", "bytes_received")):
+            metric = "%s_%s" % (prefix, name)
+            lines.append("# TYPE %s counter" % metric)
+            for stats in self.summary():
+                labels = u'method="%s",endpoint="%s"' % (
+                    stats["method"], stats["endpoint"].replace('"', '\\"'))
+                lines.append(u"%s{%s} %d" % (metric, labels, stats[key]))
+        return u"\n".join(lines) + u"\n"
+
+    def to_statsd(self, prefix="neo4jrestclient"):
+        """
+        Return the metrics as a list of StatsD lines, with the mean latency
+        of every endpoint as a timer in milliseconds.
+        """
+        lines = []
+        for stats in self.summary():
+            endpoint = re.sub(r"[^\w]+", "_", stats["endpoint"]).strip("_")
+            name = u"%s.%s.%s" % (prefix, stats["method"].lower(), endpoint)
+            mean = stats["total_time"] * 1000.0 / stats["requests"]
+            lines.append(u"%s.requests:%d|c" % (name, stats["requests"]))
+            lines.append(u"%s.errors:%d|c" % (name, stats["errors"]))
+            lines.append(u"%s.retries:%d|c" % (name, stats["retries"]))
+            lines.append(u"%s.sent_bytes:%d|c" % (name, stats["bytes_sent"]))
+            lines.append(u"%s.received_bytes:%d|c"
+                         % (name, stats["bytes_received"]))
+            lines.append(u"%s.time:%f|ms" % (name, mean))
+        return lines
+
+
+class NPlusOneException(Exception):
+    pass
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+def get_call_site():
+    """
+    Return the innermost frame of the stack that is not part of
+    neo4jrestclient, as a tuple of filename, line number, function and line.
+    """
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame[0])
+        if (not filename.startswith(_PACKAGE_DIR)
+                or filename.startswith(_TESTS_DIR)):
+            return tuple(frame)
+    return None
+
+
+class NPlusOneDetector(object):
+    """
+    Group the requests sent through transport inside a block, or a decorated
+    function, by method and endpoint. Endpoints requested more than threshold
+    times are reported at the end with the call sites that requested them,
+    by issuing a NPlusOneWarning or, if raises is True, raising a
+    NPlusOneException.
+
+        with gdb.detect_n_plus_one(threshold=10):
+            for node in gdb.nodes.filter(...):
+                print(node["name"])
+
+    Only the requests of the thread that entered the block are counted.
+    """
+
+    def __init__(self, transport, threshold=10, raises=False):
+        self.transport = transport
+        self.threshold = threshold
+        self.raises = raises
+        self.requests = OrderedDict()
+        self._thread = None
+
+    def _pre_request(self, event):
+        if threading.current_thread() is not self._thread:
+            return
+        key = (event.method, event.endpoint)
+        if key not in self.requests:
+            self.requests[key] = {"count": 0, "call_sites": OrderedDict()}
+        endpoint = self.requests[key]
+        endpoint["count"] += 1
+        call_site = get_call_site()
+        endpoint["call_sites"][call_site] = (
+            endpoint["call_sites"].get(call_site, 0) + 1)
+
+    def __enter__(self):
+        self.requests.clear()
+        self._thread = threading.current_thread()
+        self.transport.add_hook("pre_request", self._pre_request)
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.transport.remove_hook("pre_request", self._pre_request)
+        self._thread = None
+        if type is not None or not self.detected:
+            return False
+        report = self.report()
+        if self.raises:
+            raise NPlusOneException(report)
+        warnings.warn(report, NPlusOneWarning, stacklevel=2)
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self:
+                return func(*args, **kwargs)
+        return wrapper
+
+    @property
+    def detected(self):
+        """
+        Return the method and endpoint of the requests over the threshold.
+        """
+        return [key for key, endpoint in self.requests.items()
+                if endpoint["count"] > self.threshold]
+
+    def report(self):
+        lines = ["N+1 requests detected:"]
+        for method, endpoint in self.detected:
+            stats = self.requests[(method, endpoint)]
+            lines.append("  %s %s: %d requests"
+                         % (method, endpoint, stats["count"]))
+            call_sites = sorted(stats["call_sites"].items(),
+                                key=lambda item: -item[1])
+            for call_site, count in call_sites:
+                if call_site is None:
+                    lines.append("    %d from neo4jrestclient" % count)
+                    continue
+                filename, lineno, function, line = call_site
+                lines.append("    %d at %s:%s in %s: %s"
+                             % (count, filename, lineno, function, line))
+        return "\n".join(lines)
@@ -16,3 +16,5 @@ TX_NAME = "_tx"
 VERIFY_SSL = False
 # For URI rewrites, https://github.com/neo4j/neo4j/issues/2985
 URI_REWRITES = {}
+# Lazy loading of nodes and relationships
+LAZY_LOADING = False
@@ -1,16 +1,23 @@
 # -*- coding: utf-8 -*-
 # Inspired by: https://github.com/CulturePlex/Sylva
 #                     /tree/master/sylva/engines/gdb/lookups
+import codecs
 import json
+import re
 import uuid
-from collections import Sequence
+try:
+    from collections.abc import Sequence
+except ImportError:
+    from collections import Sequence
 import warnings
 
 from neo4jrestclient.constants import RAW
 from neo4jrestclient.iterable import Iterable
 from neo4jrestclient.request import Request
 from neo4jrestclient.exceptions import StatusException, TransactionException
-from neo4jrestclient.utils import text_type, string_types, in_ipnb, rewrites
+from neo4jrestclient.utils import (
+    text_type, string_types, in_ipnb, rewrites, rebase
+)
 
 
 class BaseQ(object):
@@ -292,6 +299,24 @@ class Q(BaseQ):
         return query, params
 
 
+# Clauses that write to the graph, or might write through procedures
+WRITE_CLAUSES = re.compile(r"\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP|FOREACH|"
+                           r"LOAD\s+CSV|CALL)\b", re.IGNORECASE)
+
+
+# Functions allowed by FilterSequence.aggregate
+AGGREGATE_FUNCTIONS = ("avg", "count", "max", "min", "sum")
+
+
+def is_read_query(q):
+    """
+    Return True if the Cypher query q doesn't write to the graph, so it can
+    be sent again safely. Queries mentioning the writing clauses anywhere,
+    even inside strings, are considered writes.
+    """
+    return WRITE_CLAUSES.search(q) is None
+
+
 class CypherException(Exception):
     pass
 
@@ -641,10 +666,17 @@ class QuerySequence(Sequence):
             height=height,
         ))
 
-    def get_response(self):
+    def get_response(self, q=None, params=None):
+        if q is None:
+            q = self.q
+        if params is None:
+            params = self.params
+        q = self._add_ordering_and_slicing(q, params)
+        # Making the real resquest
+        return self._send_query(q, params)
+
+    def _add_ordering_and_slicing(self, q, params):
         # Preparing slicing and ordering
-        q = self.q
-        params = self.params
         version = self._auth.get('version', None)
         NEO4J_V2 = version and version.split(".")[0] >= "2"
         if self._order_by:
@@ -674,12 +706,15 @@ class QuerySequence(Sequence):
         if isinstance(self._limit, int) and "_limit" not in params:
             q = u"%s limit {_limit} " % q
             params["_limit"] = self._limit
-        # Making the real resquest
+        return q
+
+    def _send_query(self, q, params):
         data = {
             "query": q,
             "params": params,
         }
-        response = Request(**self._auth).post(self._cypher, data=data)
+        response = Request(**self._auth).post(self._cypher, data=data,
+                                              idempotent=is_read_query(q))
         if response.status_code == 200:
             response_json = response.json()
             return response_json
@@ -797,6 +832,157 @@ class QuerySequence(Sequence):
             return results
 
 
+def _iter_json_stream(chunks, array_key, keys=None):
+    """
+    Incremental parser for JSON documents with a (potentially huge) array
+    under the key array_key, from the chunks of text in chunks.
+
+    Yields a tuple (array_key, element) for every element of the array, and
+    (key, value) for the keys in keys found before or after it. Only an
+    element of the array is kept in memory at a time.
+    """
+    decoder = json.JSONDecoder()
+    scanstring = json.decoder.scanstring
+    keys = keys or ()
+    whitespaces = u" \t\n\r"
+    chunks = iter(chunks)
+    buf = u""
+    pos = 0
+    in_array = False
+
+    def skip(buf, pos, chars):
+        while pos < len(buf) and buf[pos] in chars:
+            pos += 1
+        if pos >= len(buf):
+            raise IndexError
+        return pos
+
+    while True:
+        try:
+            if in_array:
+                pos = skip(buf, pos, whitespaces + u",")
+                if buf[pos] == u"]":
+                    in_array = False
+                    pos += 1
+                    continue
+                value, pos = decoder.raw_decode(buf, pos)
+                yield array_key, value
+            else:
+                quote = buf.find(u"\"", pos)
+                if quote == -1:
+                    pos = len(buf)
+                    raise IndexError
+                pos = quote
+                key, end = scanstring(buf, pos + 1)
+                colon = skip(buf, end, whitespaces)
+                if buf[colon] != u":":
+                    # Just a string value, not a key
+                    pos = end
+                    continue
+                start = skip(buf, colon + 1, whitespaces)
+                if key == array_key and buf[start] == u"[":
+                    in_array = True
+                    pos = start + 1
+                elif key in keys:
+                    value, end = decoder.raw_decode(buf, start)
+                    if (end == len(buf)
+                            and not isinstance(value, (dict, list))):
+                        # The value could continue in the next chunk
+                        raise IndexError
+                    pos = end
+                    yield key, value
+                else:
+                    pos = start
+        except (IndexError, ValueError):
+            chunk = next(chunks, None)
+            if chunk is None:
+                if in_array:
+                    raise ValueError("Unexpected end of JSON document")
+                return
+            buf = buf[pos:] + chunk
+            pos = 0
+
+
+class QueryStream(object):
+    """
+    Iterable over the results of a Cypher query. The rows are read from
+    the response, parsed and casted one by one while iterating, so memory
+    usage does not depend on the number of rows returned.
+    """
+
+    def __init__(self, cypher, auth, q, params=None, types=None, returns=None,
+                 transaction=None, chunk_size=8192):
+        self.q = q
+        self.params = params
+        self.columns = None
+        self.stats = None
+        self.chunk_size = chunk_size
+        self._returns = returns
+        self._return_single_rows = False
+        self._auth = auth
+        self._cypher = cypher
+        self._types = types or {}
+        self._elements_row = None
+        self._elements_graph = None
+        if transaction:
+            # The query is executed in its own transaction
+            self.url = u"{}/commit".format(transaction)
+            self.data = {
+                "statements": [{
+                    "statement": q,
+                    "parameters": params or {},
+                    "resultDataContents": ["REST"],
+                }],
+            }
+        else:
+            self.url = cypher
+            self.data = {
+                "query": q,
+                "params": params or {},
+            }
+
+    def __iter__(self):
+        request = Request(**self._auth)
+        response = request.post(self.url, data=self.data, stream=True,
+                                idempotent=is_read_query(self.q))
+        try:
+            if response.status_code == 400:
+                err_msg = u"Cypher query exception"
+                try:
+                    err_msg = "%s: %s" % (err_msg, response.json()["message"])
+                except (ValueError, KeyError):
+                    err_msg = "%s: %s" % (err_msg, response.text)
+                raise CypherException(err_msg)
+            elif response.status_code not in (200, 201):
+                raise StatusException(response.status_code,
+                                      "Invalid data sent")
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            chunks = (decoder.decode(chunk) for chunk
+                      in response.iter_content(self.chunk_size))
+            items = _iter_json_stream(chunks, "data",
+                                      keys=("columns", "stats", "errors"))
+            bases = getattr(response, "rebase", None)
+            for key, value in items:
+                if bases is not None:
+                    value = rebase(value, *bases)
+                if key == "data":
+                    if self._returns and self._returns is not RAW:
+                        yield QuerySequence.cast(self, elements=[value],
+                                                 returns=self._returns)[0]
+                    elif isinstance(value, dict):
+                        yield rewrites(value.get("rest", None))
+                    else:
+                        yield rewrites(value)
+                elif key == "columns":
+                    self.columns = value
+                elif key == "stats":
+                    self.stats = value
+                elif key == "errors":
+                    QueryTransaction._manage_errors(value)
+        finally:
+            response.close()
+
+
 class QueryTransaction(object):
     """
     Transaction class for tge Cypher endpoint.
@@ -831,7 +1017,8 @@ class QueryTransaction(object):
                 self.rollback()
         return True
 
-    def _manage_errors(self, errors):
+    @staticmethod
+    def _manage_errors(errors):
         message = u""
         if errors:
             for error in errors:
@@ -855,7 +1042,11 @@ class QueryTransaction(object):
         data = {
             "statements": statements
         }
-        response = request.post(url, data=data)
+        # Only reads committed in a single request can be sent again
+        idempotent = (url == u"{}/commit".format(self.url_begin)
+                      and all(is_read_query(statement["statement"])
+                              for statement in statements))
+        response = request.post(url, data=data, idempotent=idempotent)
         if response.status_code in [200, 201]:
             return response
         else:
@@ -991,9 +1182,10 @@ class FilterSequence(QuerySequence):
             where, params = wheres.get_query_objects(var="n",
                                                      version=self.version)
         if where:
-            q = u"{} where {} return n ".format(q, where)
-        else:
-            q = u"{} return n ".format(q)
+            q = u"{} where {}".format(q, where)
+        # Kept without the return clause for count, exists and aggregate
+        self._q_match = q
+        q = u"{} return n ".format(q)
         super(FilterSequence, self).__init__(cypher=cypher, auth=auth, q=q,
                                              params=params, types=types,
                                              returns=returns, lazy=True)
@@ -1011,3 +1203,103 @@ class FilterSequence(QuerySequence):
         else:
             self._order_by = [(property, type, nullable)]
         return self
+
+    def _get_params(self):
+        # Without the ordering and slicing params of a previous run
+        return dict((k, v) for k, v in (self.params or {}).items()
+                    if not k.startswith("_"))
+
+    def _is_sliced(self):
+        return isinstance(self._skip, int) or isinstance(self._limit, int)
+
+    def _get_scalars(self, returns):
+        q = self._q_match
+        params = self._get_params()
+        if self._is_sliced():
+            # Only the elements in the slice are counted or aggregated
+            q = self._add_ordering_and_slicing(u"%s with n" % q, params)
+        q = u"{} return {} ".format(q, returns)
+        return self._send_query(q, params)["data"]
+
+    def count(self):
+        """
+        Return the number of elements matched by the filter, or in its
+        slice. Unless they are already retrieved, only the result of a
+        Cypher count() is requested.
+        """
+        if self._elements is not None and not self._is_sliced():
+            return len(self._elements)
+        return self._get_scalars(u"count(n)")[0][0]
+
+    def exists(self):
+        """
+        Return True if the filter, or its slice, matches at least one
+        element, asking just for the id of the first one.
+        """
+        if self._elements is not None and not self._is_sliced():
+            return len(self._elements) > 0
+        return len(self._get_scalars(u"id(n) limit 1")) > 0
+
+    def aggregate(self, **aggregations):
+        """
+        Return a dictionary with the result of each aggregation function,
+        computed by the server over a property of the matched elements, or
+        the ones in the slice of the filter, e.g.
+        aggregate(sum="age", max="height"). The functions available are
+        avg, count, max, min, and sum.
+        """
+        NEO4J_V2 = self.version and self.version.split(".")[0] >= "2"
+        names = sorted(aggregations.keys())
+        returns = []
+        for name in names:
+            if name not in AGGREGATE_FUNCTIONS:
+                raise ValueError(u"Aggregate function must be one of: %s"
+                                 % u", ".join(AGGREGATE_FUNCTIONS))
+            prop = text_type(aggregations[name]).replace(u"`", u"\\`")
+            nullable = u"" if NEO4J_V2 else u"?"
+            returns.append(u"%s(n.`%s`%s)" % (name, prop, nullable))
+        if not returns:
+            return {}
+        row = self._get_scalars(u", ".join(returns))[0]
+        return dict(zip(names, row))
+
+    def _get_projection(self, fields):
+        if not fields:
+            raise ValueError(u"At least one field is needed")
+        NEO4J_V2 = self.version and self.version.split(".")[0] >= "2"
+        returns = []
+        for field in fields:
+            if field == "id":
+                returns.append(u"id(n)")
+            else:
+                prop = text_type(field).replace(u"`", u"\\`")
+                nullable = u"" if NEO4J_V2 else u"?"
+                returns.append(u"n.`%s`%s" % (prop, nullable))
+        q = u"{} return {} ".format(self._q_match, u", ".join(returns))
+        # Ordering and slicing are kept
+        return self.get_response(q=q, params=self._get_params())["data"]
+
+    def values(self, *fields):
+        """
+        Return a list with a dictionary per element, containing only the
+        values of the properties in fields, or "id" for the element id, as
+        they are sent by the server. No Node or Relationship is built.
+        """
+        return [dict(zip(fields, row))
+                for row in self._get_projection(fields)]
+
+    def values_list(self, *fields, **kwargs):
+        """
+        Like values, but return a tuple per element. If flat is True and
+        there is only one field, return a list of the values instead.
+        """
+        flat = kwargs.pop("flat", False)
+        if kwargs:
+            raise TypeError(u"Unexpected keyword arguments: %s"
+                            % u", ".join(kwargs.keys()))
+        if flat and len(fields) > 1:
+            raise TypeError(u"'flat' is only valid with a single field")
+        rows = self._get_projection(fields)
+        if flat:
+            return [row[0] for row in rows]
+        return [tuple(row) for row in rows]
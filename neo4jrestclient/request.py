@@ -1,18 +1,33 @@
 # -*- coding: utf-8 -*-
-import datetime
-import decimal
-import re
-import requests
 import json
+import random
+import requests
+import threading
 import time
+import zlib
+
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.connection import (
+    HTTPConnection, HTTPSConnection
+)
+from requests.packages.urllib3.connectionpool import (
+    HTTPConnectionPool, HTTPSConnectionPool
+)
+from requests.packages.urllib3.exceptions import NewConnectionError
 
 from neo4jrestclient import options
+from neo4jrestclient.codec import get_codec
 from neo4jrestclient.constants import __version__
 from neo4jrestclient.exceptions import StatusException
-from neo4jrestclient.utils import string_types, get_auth_from_uri
+from neo4jrestclient.limits import Limiter
+from neo4jrestclient.metrics import Metrics, RequestEvent
+from neo4jrestclient.utils import string_types, get_auth_from_uri, rebase
 
 if options.DEBUG:
-    import httplib
+    try:
+        import httplib
+    except ImportError:
+        import http.client as httplib
     import logging
     httplib.HTTPConnection.debuglevel = 1
     logging.basicConfig()
@@ -21,10 +36,12 @@ if options.DEBUG:
     requests_log.setLevel(logging.DEBUG)
     requests_log.propagate = True
 session = requests.Session()
+cache = None
 
 if options.CACHE:
     try:
         from cachecontrol import CacheControl
+        from cachecontrol.adapter import CacheControlAdapter
         from cachecontrol.cache import DictCache
         from cachecontrol.caches import FileCache
     except ImportError as e:
@@ -41,6 +58,494 @@ if options.CACHE:
     session = CacheControl(session, cache=cache)
 
 
+# Content codings supported for the bodies of requests
+COMPRESSIONS = ("gzip", "deflate")
+
+# Methods that can be sent again without changing the result
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT")
+
+# Methods that don't change the graph, so they can be sent to replicas
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Statuses of requests that were not processed by the server
+RETRY_STATUSES = (429, 503)
+
+# Statuses of requests that might have been processed
+RETRY_IDEMPOTENT_STATUSES = (502, 504)
+
+
+# Statuses of requests that mark an endpoint of a router as failing
+ROUTER_FAILURE_STATUSES = (502, 503, 504)
+
+
+def compress(data, encoding="gzip", level=6):
+    if encoding == "gzip":
+        compressor = zlib.compressobj(level, zlib.DEFLATED,
+                                      16 + zlib.MAX_WBITS)
+    else:
+        compressor = zlib.compressobj(level)
+    return compressor.compress(data) + compressor.flush()
+
+
+def prepare(username=None, password=None, cert_file=None, key_file=None):
+    """
+    Return the parts of requests that are the same for every request with
+    the same credentials: the auth tuple, the cert, and the headers for
+    requests without and with a body.
+    """
+    auth = None
+    if username and password:
+        auth = (username, password)
+    cert = None
+    if cert_file:
+        if key_file:
+            cert = (cert_file, key_file)
+        else:
+            cert = cert_file
+    headers = {
+        'Accept': 'application/json; charset=UTF-8',
+        'Accept-Encoding': 'gzip, deflate',
+        'Accept-Charset': 'UTF-8,ISO-8859-1;q=0.7,*;q=0.7',
+        'Connection': 'keep-alive',
+        'User-Agent': 'neo4jrestclient/%s ' % __version__,
+    }
+    if not options.CACHE:
+        headers['Cache-Control'] = 'no-cache'
+    body_headers = dict(headers)
+    body_headers['Content-Type'] = 'application/json'
+    return auth, cert, headers, body_headers
+
+
+def _release_on_close(response, release):
+    """
+    Call release only once, when the streamed response is closed or its
+    content is read completely.
+    """
+    released = []
+    close = response.close
+    iter_content = response.iter_content
+
+    def release_once():
+        if not released:
+            released.append(True)
+            release()
+
+    def close_and_release():
+        try:
+            close()
+        finally:
+            release_once()
+
+    def iter_content_and_release(*args, **kwargs):
+        for chunk in iter_content(*args, **kwargs):
+            yield chunk
+        release_once()
+
+    response.close = close_and_release
+    response.iter_content = iter_content_and_release
+
+
+# Time spent opening connections by the requests of every thread
+_timings = threading.local()
+
+
+class _TimedConnectionMixin(object):
+
+    def connect(self):
+        start = time.time()
+        try:
+            return super(_TimedConnectionMixin, self).connect()
+        finally:
+            _timings.connect_time = (getattr(_timings, "connect_time", 0)
+                                     + time.time() - start)
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class Transport(object):
+    """
+    Pool of HTTP connections owned by a GraphDatabase.
+
+    The pool keeps up to pool_maxsize connections for each one of the
+    pool_connections hosts, blocking when all of them are in use if pool_block
+    is True. Connections idle for more than keep_alive seconds are closed.
+
+    If compress is "gzip" (or True) or "deflate", bodies of at least
+    compress_min_size bytes are sent compressed. The bytes sent and
+    received, and the bytes saved by compression, are counted in stats.
+
+    Callbacks added with add_hook("pre_request", callback) or
+    add_hook("post_request", callback) receive a RequestEvent before and after
+    every request. If metrics is True (or a Metrics object), the requests are
+    aggregated by endpoint in the metrics attribute.
+
+    Failed requests are retried up to max_retries times, waiting a random
+    time up to backoff_factor * 2 ** retry seconds (at most backoff_max)
+    between attempts, while the time since the first attempt is below
+    retry_deadline seconds. Idempotent requests, like GET or Cypher reads,
+    are retried on errors of the connection and on 502, 503 and 504
+    statuses. Any other request is only retried when the server did not
+    process it: when the connection could not be established, on 429 and 503
+    statuses, or on transient errors of transactions committed in a single
+    request, since they are rolled back.
+
+    If router is a Router object, requests to its endpoints are sent to the
+    primary endpoint, or balanced across the replicas if they are reads.
+    Endpoints failing with errors, or with 502, 503 and 504 statuses, are
+    marked as unhealthy, but not the ones answering 429 to rate limit.
+
+    Requests in flight can be limited to max_concurrency, and the ones sent
+    per second to rate_limit (with bursts of up to rate_burst requests).
+    Streamed responses are in flight until they are closed or read.
+    Requests exceeding the limits wait for at most queue_timeout seconds
+    before raising a LimitException.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False,
+                 keep_alive=None, compress=None, compress_min_size=1024,
+                 compress_level=6, metrics=None, max_retries=3,
+                 backoff_factor=0.1, backoff_max=10, retry_deadline=None,
+                 router=None, max_concurrency=None, rate_limit=None,
+                 rate_burst=None, queue_timeout=None):
+        if compress is True:
+            compress = "gzip"
+        elif compress is False:
+            compress = None
+        if compress is not None and compress not in COMPRESSIONS:
+            raise ValueError("Unknown compression '%s'" % compress)
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.compress = compress
+        self.compress_min_size = compress_min_size
+        self.compress_level = compress_level
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_deadline = retry_deadline
+        self.router = router
+        self.limiter = None
+        if max_concurrency is not None or rate_limit is not None:
+            self.limiter = Limiter(max_concurrency=max_concurrency,
+                                   rate=rate_limit, burst=rate_burst,
+                                   timeout=queue_timeout)
+        self._last_used = None
+        self._lock = threading.Lock()
+        self._prepared = {}
+        self.hooks = {"pre_request": [], "post_request": []}
+        if metrics is True:
+            metrics = Metrics()
+        elif metrics is False:
+            metrics = None
+        self.metrics = metrics
+        if metrics is not None:
+            self.add_hook("post_request", metrics)
+        self.reset_stats()
+        self.session = self._get_session()
+
+    def _get_session(self):
+        pool_kwargs = {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "pool_block": self.pool_block,
+        }
+        if cache is not None:
+            adapter = CacheControlAdapter(cache=cache, **pool_kwargs)
+        else:
+            adapter = HTTPAdapter(**pool_kwargs)
+        # Connections are timed to report the time spent opening them
+        adapter.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+        _session = requests.Session()
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+        return _session
+
+    def prepare(self, username=None, password=None, cert_file=None,
+                key_file=None):
+        """
+        Return the result of prepare() for the credentials, computed only
+        once for every GraphDatabase using this transport.
+        """
+        key = (username, password, cert_file, key_file)
+        prepared = self._prepared.get(key, None)
+        if prepared is None:
+            prepared = prepare(username, password, cert_file, key_file)
+            self._prepared[key] = prepared
+        return prepared
+
+    def add_hook(self, event, callback):
+        if event not in self.hooks:
+            raise ValueError("Unknown hook '%s'" % event)
+        self.hooks[event].append(callback)
+
+    def remove_hook(self, event, callback):
+        if event not in self.hooks:
+            raise ValueError("Unknown hook '%s'" % event)
+        self.hooks[event].remove(callback)
+
+    def _compress(self, kwargs):
+        data = kwargs.get("data", None)
+        if not data:
+            return 0
+        if not isinstance(data, bytes):
+            data = data.encode("utf-8")
+        size = len(data)
+        compressed = False
+        if self.compress is not None and size >= self.compress_min_size:
+            data = compress(data, self.compress, self.compress_level)
+            headers = dict(kwargs.get("headers", None) or {})
+            headers["Content-Encoding"] = self.compress
+            kwargs["headers"] = headers
+            compressed = True
+        kwargs["data"] = data
+        with self._lock:
+            self.bytes_sent += len(data)
+            if compressed:
+                self.requests_compressed += 1
+                self.bytes_sent_saved += size - len(data)
+        return len(data)
+
+    def _count_response(self, response):
+        size = len(response.content)
+        received = size
+        compressed = (response.headers.get("content-encoding", None)
+                      in COMPRESSIONS)
+        if compressed:
+            try:
+                # Bytes read from the connection, before decompressing
+                received = response.raw.tell()
+            except (AttributeError, IOError, ValueError):
+                pass
+        with self._lock:
+            self.bytes_received += received
+            if compressed:
+                self.responses_compressed += 1
+                self.bytes_received_saved += size - received
+        return received
+
+    def _get_retry_after(self, url, idempotent, response=None, error=None,
+                         stream=False):
+        """
+        Return the seconds the server asked to wait before retrying the
+        request, 0 if not specified, or None if it must not be retried.
+        """
+        if error is not None:
+            # The cause of connection errors raised by urllib3
+            reason = getattr(error.args[0] if error.args else None,
+                             "reason", None)
+            not_sent = (isinstance(error, requests.ConnectTimeout)
+                        or isinstance(reason, NewConnectionError))
+            return 0 if not_sent or idempotent else None
+        status_code = response.status_code
+        if status_code in RETRY_STATUSES or (
+                idempotent and status_code in RETRY_IDEMPOTENT_STATUSES):
+            try:
+                return max(float(response.headers.get("retry-after", 0)), 0)
+            except ValueError:
+                return 0
+        # Streamed bodies are not read here, so they are never retried
+        if (status_code == 200 and not stream
+                and url.rstrip("/").endswith("transaction/commit")
+                and b"TransientError" in response.content):
+            try:
+                errors = json.loads(response.content.decode("utf-8"))
+            except ValueError:
+                return None
+            for error in errors.get("errors", []):
+                if error.get("code", "").startswith("Neo.TransientError"):
+                    return 0
+        return None
+
+    def _get_retry_delay(self, retries, retry_after, start, deadline):
+        """
+        Return the seconds to wait before retrying, or None if there are no
+        retries left.
+        """
+        if retries >= self.max_retries:
+            return None
+        backoff = min(self.backoff_max, self.backoff_factor * 2 ** retries)
+        # Full jitter, so clients failing at the same time don't retry at
+        # the same time too
+        delay = max(random.uniform(0, backoff), retry_after)
+        if deadline is not None and time.time() + delay - start > deadline:
+            return None
+        return delay
+
+    def _get_release(self, endpoint, start, response=None):
+        """
+        Return a function that frees the slot of the limiter and updates the
+        endpoint of the router, if any, once the request has finished.
+        """
+        def release():
+            try:
+                if endpoint is not None:
+                    # Rate limits are not a failure of the endpoint
+                    failed = response is None or response.status_code in (
+                        ROUTER_FAILURE_STATUSES)
+                    self.router.release(endpoint, time.time() - start,
+                                        failed=failed)
+            finally:
+                if self.limiter is not None:
+                    self.limiter.release()
+        return release
+
+    def request(self, method, url, idempotent=None, deadline=None,
+                **kwargs):
+        """
+        Send a request, retrying it if needed. If idempotent is None, only
+        requests with methods in IDEMPOTENT_METHODS are considered idempotent.
+        POST requests marked as idempotent are reads, like GET requests.
+        If deadline is None, retry_deadline is used.
+        """
+        now = time.time()
+        if (self.keep_alive is not None and self._last_used is not None
+                and now - self._last_used > self.keep_alive):
+            # Connections are dropped and created again by demand
+            self.session.close()
+        self._last_used = now
+        read = (method.upper() in READ_METHODS
+                or (method.upper() == "POST" and idempotent is True))
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        if deadline is None:
+            deadline = self.retry_deadline
+        event = RequestEvent(method, url)
+        for hook in self.hooks["pre_request"]:
+            hook(event)
+        event.bytes_sent = self._compress(kwargs)
+        _timings.connect_time = 0
+        try:
+            while True:
+                response = None
+                error = None
+                endpoint = None
+                target = url
+                if self.limiter is not None:
+                    event.wait_time += self.limiter.acquire()
+                start = time.time()
+                try:
+                    if self.router is not None:
+                        endpoint, target = self.router.route(url, read=read)
+                    response = self.session.request(method, target, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                finally:
+                    release = self._get_release(endpoint, start, response)
+                    if response is not None and kwargs.get("stream", False):
+                        # Bodies of streams are still being sent
+                        _release_on_close(response, release)
+                    else:
+                        release()
+                if endpoint is not None and target != url:
+                    # Links sent by other endpoints must point to the
+                    # same URLs as links sent by the one requested
+                    base = url[:len(url) - len(target) + len(endpoint.base)]
+                    if base != endpoint.base and response is not None:
+                        response.rebase = (endpoint.base, base)
+                retry_after = self._get_retry_after(
+                    url, idempotent, response, error,
+                    stream=kwargs.get("stream", False))
+                if retry_after is None:
+                    break
+                delay = self._get_retry_delay(event.retries, retry_after,
+                                              now, deadline)
+                if delay is None:
+                    with self._lock:
+                        self.retries_exhausted += 1
+                    break
+                if response is not None:
+                    response.close()
+                event.retries += 1
+                with self._lock:
+                    self.retries += 1
+                time.sleep(delay)
+            if error is not None:
+                raise error
+            event.status_code = response.status_code
+            event.ttfb = response.elapsed.total_seconds()
+            if not kwargs.get("stream", False):
+                event.bytes_received = self._count_response(response)
+            return response
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            self._last_used = time.time()
+            event.total_time = self._last_used - now
+            event.connect_time = _timings.connect_time
+            for hook in self.hooks["post_request"]:
+                hook(event)
+
+    def close(self):
+        self.session.close()
+
+    def reset_stats(self):
+        self.retries = 0
+        self.retries_exhausted = 0
+        self.requests_compressed = 0
+        self.responses_compressed = 0
+        self.bytes_sent = 0
+        self.bytes_sent_saved = 0
+        self.bytes_received = 0
+        self.bytes_received_saved = 0
+
+    @property
+    def stats(self):
+        return {
+            "retries": self.retries,
+            "retries_exhausted": self.retries_exhausted,
+            "requests_compressed": self.requests_compressed,
+            "responses_compressed": self.responses_compressed,
+            "bytes_sent": self.bytes_sent,
+            "bytes_sent_saved": self.bytes_sent_saved,
+            "bytes_received": self.bytes_received,
+            "bytes_received_saved": self.bytes_received_saved,
+        }
+
+    # Special methods for handle pickling manually
+    def __getstate__(self):
+        return {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "pool_block": self.pool_block,
+            "keep_alive": self.keep_alive,
+            "compress": self.compress,
+            "compress_min_size": self.compress_min_size,
+            "compress_level": self.compress_level,
+            "metrics": self.metrics is not None,
+            "max_retries": self.max_retries,
+            "backoff_factor": self.backoff_factor,
+            "backoff_max": self.backoff_max,
+            "retry_deadline": self.retry_deadline,
+            "router": self.router,
+            "max_concurrency": getattr(self.limiter, "max_concurrency", None),
+            "rate_limit": getattr(self.limiter, "rate", None),
+            "rate_burst": getattr(self.limiter, "burst", None),
+            "queue_timeout": getattr(self.limiter, "timeout", None),
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
 class Request(object):
     """
     Create an HTTP request object for HTTP
@@ -48,156 +553,124 @@ class Request(object):
     """
 
     def __init__(self, username=None, password=None, key_file=None,
-                 cert_file=None, **kwargs):
+                 cert_file=None, transport=None, codec=None, **kwargs):
         self.username = username
         self.password = password
         self.key_file = key_file
         self.cert_file = cert_file
-        self._illegal_s = re.compile(r"((^|[^%])(%%)*%s)")
+        self.transport = transport
+        self.codec = get_codec(codec)
+        if transport is not None:
+            prepared = transport.prepare(username, password, cert_file,
+                                         key_file)
+        else:
+            prepared = prepare(username, password, cert_file, key_file)
+        (self._prepared_auth, self._cert, self._headers,
+         self._body_headers) = prepared
 
-    def get(self, url, headers=None):
+    def get(self, url, headers=None, stream=False, deadline=None):
         """
         Perform an HTTP GET request for a given URL.
-        Returns the response object.
+        Returns the response object. If deadline is given, the request is
+        not retried after that many seconds instead of the retry_deadline
+        of the transport.
         """
-        return self._request('GET', url, headers=headers)
+        return self._request('GET', url, headers=headers, stream=stream,
+                             deadline=deadline)
 
-    def post(self, url, data, headers=None):
+    def post(self, url, data, headers=None, stream=False, idempotent=None,
+             deadline=None):
         """
         Perform an HTTP POST request for a given url.
-        Returns the response object.
+        Returns the response object. If stream is True, the body of the
+        response is not read until it is accessed. If idempotent is True,
+        the request is a read, retried and routed like a GET request.
         """
-        return self._request('POST', url, data, headers=headers)
+        return self._request('POST', url, data, headers=headers,
+                             stream=stream, idempotent=idempotent,
+                             deadline=deadline)
 
-    def put(self, url, data, headers=None):
+    def put(self, url, data, headers=None, deadline=None):
         """
         Perform an HTTP PUT request for a given url.
         Returns the response object.
         """
-        return self._request('PUT', url, data, headers=headers)
+        return self._request('PUT', url, data, headers=headers,
+                             deadline=deadline)
 
-    def delete(self, url, headers=None):
+    def delete(self, url, headers=None, deadline=None):
         """
         Perform an HTTP DELETE request for a given url.
         Returns the response object.
         """
-        return self._request('DELETE', url, headers=headers)
-
-    # Proleptic Gregorian dates and strftime before 1900 « Python recipes
-    # ActiveState Code: http://bit.ly/9t0JKb via @addthis
-
-    def _findall(self, text, substr):
-        # Also finds overlaps
-        sites = []
-        i = 0
-        while 1:
-            j = text.find(substr, i)
-            if j == -1:
-                break
-            sites.append(j)
-            i = j + 1
-        return sites
-
-    # Every 28 years the calendar repeats, except through century leap
-    # years where it's 6 years.  But only if you're using the Gregorian
-    # calendar.  ;)
-
-    def _strftime(self, dt, fmt):
-        if self._illegal_s.search(fmt):
-            raise TypeError("This strftime implementation does not handle %s")
-        if dt.year > 1900:
-            return dt.strftime(fmt)
-        year = dt.year
-        # For every non-leap year century, advance by
-        # 6 years to get into the 28-year repeat cycle
-        delta = 2000 - year
-        off = 6 * (delta // 100 + delta // 400)
-        year = year + off
-        # Move to around the year 2000
-        year = year + ((2000 - year) // 28) * 28
-        timetuple = dt.timetuple()
-        s1 = time.strftime(fmt, (year,) + timetuple[1:])
-        sites1 = self._findall(s1, str(year))
-        s2 = time.strftime(fmt, (year + 28,) + timetuple[1:])
-        sites2 = self._findall(s2, str(year + 28))
-        sites = []
-        for site in sites1:
-            if site in sites2:
-                sites.append(site)
-        s = s1
-        syear = "%4d" % (dt.year, )
-        for site in sites:
-            s = s[:site] + syear + s[site + 4:]
-        return s
+        return self._request('DELETE', url, headers=headers,
+                             deadline=deadline)
 
     def _json_encode(self, data, ensure_ascii=False):
+        return self.codec.encode(data, ensure_ascii=ensure_ascii)
 
-        def _any(data):
-            ret = None
-            if isinstance(data, (list, tuple)):
-                ret = _list(data)
-            elif isinstance(data, dict):
-                ret = _dict(data)
-            elif isinstance(data, decimal.Decimal):
-                ret = str(data)
-            elif isinstance(data, datetime.datetime):
-                ret = self._strftime(data, options.DATETIME_FORMAT)
-            elif isinstance(data, datetime.date):
-                ret = self._strftime(data, options.DATE_FORMAT)
-            elif isinstance(data, datetime.time):
-                ret = data.strftime(options.TIME_FORMAT)
-            else:
-                ret = data
-            return ret
-
-        def _list(data):
-            ret = []
-            for v in data:
-                ret.append(_any(v))
-            return ret
-
-        def _dict(data):
-            ret = {}
-            for k, v in data.items():
-                # Neo4j doesn't allow 'null' properties
-                if v is not None:
-                    ret[k] = _any(v)
-            return ret
-        ret = _any(data)
-        return json.dumps(ret, ensure_ascii=ensure_ascii)
-
-    def _request(self, method, url, data={}, headers={}):
-        username_uri, password_uri, root_uri = get_auth_from_uri(url)
-        username = username_uri or self.username
-        password = password_uri or self.password
-        cert = None
-        if self.cert_file:
-            if self.key_file:
-                cert = (self.cert_file, self.key_file)
-            else:
-                cert = self.cert_file
-        headers = headers or {}
-        headers['Accept'] = 'application/json; charset=UTF-8'
-        headers['Accept-Encoding'] = '*'
-        headers['Accept-Charset'] = 'UTF-8,ISO-8859-1;q=0.7,*;q=0.7'
-        headers['Connection'] = 'keep-alive'
-        if not options.CACHE:
-            headers['Cache-Control'] = 'no-cache'
-        headers['User-Agent'] = 'neo4jrestclient/%s ' % __version__
-        auth = None
-        if username and password:
-            auth = (username, password)
+    def _json_decode(self, response):
+        # Responses are decoded by the codec instead of by requests
+        codec = self.codec
+        bases = getattr(response, "rebase", None)
+        if bases is not None:
+            response.json = lambda **kwargs: rebase(
+                codec.decode(response.content), *bases)
+        else:
+            response.json = lambda **kwargs: codec.decode(response.content)
+        return response
+
+    def _prepare(self, method, url, data={}, headers={}):
+        """
+        Return the URL without credentials and the arguments for the
+        transport to perform the request.
+        """
+        auth = self._prepared_auth
+        root_uri = url
+        # Only URLs with credentials need to be parsed
+        if "@" in url:
+            username_uri, password_uri, root_uri = get_auth_from_uri(url)
+            if username_uri or password_uri:
+                username = username_uri or self.username
+                password = password_uri or self.password
+                auth = None
+                if username and password:
+                    auth = (username, password)
         if method in ("POST", "PUT"):
-            headers['Content-Type'] = 'application/json'
+            base_headers = self._body_headers
+        else:
+            base_headers = self._headers
+        if headers:
+            headers = dict(headers)
+            headers.update(base_headers)
+        else:
+            # Headers are not modified, so they can be shared by requests
+            headers = base_headers
         data = self._json_encode(data, ensure_ascii=True)
-        verify = options.VERIFY_SSL
+        return root_uri, {
+            "headers": headers,
+            "data": data,
+            "cert": self._cert,
+            "auth": auth,
+            "verify": options.VERIFY_SSL,
+        }
+
+    def _request(self, method, url, data={}, headers={}, stream=False,
+                 idempotent=None, deadline=None):
+        root_uri, kwargs = self._prepare(method, url, data, headers)
         try:
-            method = method.lower()
-            response = getattr(session, method)(root_uri, headers=headers,
-                                                data=data, cert=cert,
-                                                auth=auth, verify=verify)
+            if self.transport is not None:
+                response = self.transport.request(method, root_uri,
+                                                  stream=stream,
+                                                  idempotent=idempotent,
+                                                  deadline=deadline,
+                                                  **kwargs)
+            else:
+                method = method.lower()
+                response = getattr(session, method)(root_uri, stream=stream,
+                                                    **kwargs)
             if response.status_code == 401:
                 raise StatusException(401, "Authorization Required")
-            return response
+            return self._json_decode(response)
         except AttributeError:
             raise Exception("Unknown error. Is the server running?")
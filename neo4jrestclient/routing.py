@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+import random
+import re
+import threading
+import time
+
+from neo4jrestclient.utils import get_auth_from_uri, urlparse
+
+
+PRIMARY = "primary"
+REPLICA = "replica"
+ROLES = (PRIMARY, REPLICA)
+
+LEAST_OUTSTANDING = "least_outstanding"
+LATENCY = "latency"
+BALANCINGS = (LEAST_OUTSTANDING, LATENCY)
+
+# Resources kept in the memory of the server that created them, like open
+# transactions or paged traversals
+PINNED_PATHS = re.compile(r"/paged/traverse/|/transaction/\d+")
+
+
+def _get_base(url):
+    splits = urlparse(url)
+    return u"%s://%s" % (splits.scheme, splits.netloc.rpartition("@")[2])
+
+
+class Endpoint(object):
+    """
+    Server of a cluster, with its role, the number of requests being sent to
+    it and the average of their latencies.
+    """
+
+    def __init__(self, url, role=REPLICA):
+        if role not in ROLES:
+            raise ValueError("Unknown role '%s'" % role)
+        xxx, xxx, self.url = get_auth_from_uri(url)
+        self.role = role
+        self.base = _get_base(self.url)
+        self.outstanding = 0
+        self.latency = None
+        self.healthy = True
+        self.failures = 0
+        self.retry_at = None
+
+    def __repr__(self):
+        return "<Endpoint %s: %s>" % (self.role, self.url)
+
+
+class Router(object):
+    """
+    Route the requests sent to any of the endpoints, a list of tuples of URL
+    and role ("primary" or "replica"). Writes are always sent to the primary,
+    while reads are balanced across the healthy replicas choosing the one
+    with less outstanding requests (balancing="least_outstanding") or
+    randomly weighted by their latencies (balancing="latency").
+
+    Replicas failing are not used for health_check_interval seconds. If all
+    of them are failing, reads are sent to the primary.
+    """
+
+    def __init__(self, endpoints, balancing=LEAST_OUTSTANDING,
+                 health_check_interval=10, latency_decay=0.3):
+        if balancing not in BALANCINGS:
+            raise ValueError("Unknown balancing '%s'" % balancing)
+        self.endpoints = []
+        self.primary = None
+        for url, role in endpoints:
+            endpoint = Endpoint(url, role)
+            if role == PRIMARY:
+                if self.primary is not None:
+                    raise ValueError("Only one primary endpoint is allowed")
+                self.primary = endpoint
+            self.endpoints.append(endpoint)
+        if self.primary is None:
+            raise ValueError("A primary endpoint is needed")
+        self.replicas = [endpoint for endpoint in self.endpoints
+                         if endpoint.role == REPLICA]
+        self.balancing = balancing
+        self.health_check_interval = health_check_interval
+        self.latency_decay = latency_decay
+        self._bases = dict((endpoint.base, endpoint)
+                           for endpoint in self.endpoints)
+        self._lock = threading.Lock()
+
+    def _is_available(self, endpoint, now):
+        if endpoint.healthy:
+            return True
+        # Failing endpoints are tried again after a while
+        return endpoint.retry_at is not None and now >= endpoint.retry_at
+
+    def _choose(self):
+        now = time.time()
+        replicas = [endpoint for endpoint in self.replicas
+                    if self._is_available(endpoint, now)]
+        if not replicas:
+            return self.primary
+        if self.balancing == LATENCY:
+            # Endpoints without requests yet are tried first
+            for endpoint in replicas:
+                if endpoint.latency is None:
+                    return endpoint
+            weights = [1.0 / max(endpoint.latency, 1e-6)
+                       for endpoint in replicas]
+            point = random.uniform(0, sum(weights))
+            for endpoint, weight in zip(replicas, weights):
+                point -= weight
+                if point <= 0:
+                    return endpoint
+            return replicas[-1]
+        return min(replicas, key=lambda endpoint: (endpoint.outstanding,
+                                                   endpoint.latency or 0))
+
+    def route(self, url, read=False):
+        """
+        Return the endpoint for the request and the URL to send it to, or
+        None and the same URL if it doesn't belong to the endpoints.
+        """
+        base = _get_base(url)
+        if base not in self._bases:
+            return None, url
+        with self._lock:
+            if not read or PINNED_PATHS.search(url):
+                endpoint = self.primary
+            else:
+                endpoint = self._choose()
+            endpoint.outstanding += 1
+        return endpoint, endpoint.base + url[len(base):]
+
+    def release(self, endpoint, latency=None, failed=False):
+        """
+        Update the endpoint after a request to it finished.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if failed:
+                endpoint.failures += 1
+                endpoint.healthy = False
+                endpoint.retry_at = time.time() + self.health_check_interval
+            else:
+                endpoint.failures = 0
+                endpoint.healthy = True
+                endpoint.retry_at = None
+                if latency is not None:
+                    if endpoint.latency is None:
+                        endpoint.latency = latency
+                    else:
+                        endpoint.latency += self.latency_decay * (
+                            latency - endpoint.latency)
+
+    def check_health(self, request):
+        """
+        Request the root of every endpoint, updating its health. Returns
+        the endpoints that are healthy.
+        """
+        for endpoint in self.endpoints:
+            url, kwargs = request._prepare("GET", endpoint.url)
+            # Sent directly by the session, so the request is not routed
+            session = request.transport.session
+            with self._lock:
+                endpoint.outstanding += 1
+            start = time.time()
+            try:
+                response = session.request("GET", url, **kwargs)
+                failed = response.status_code >= 500
+            except IOError:
+                failed = True
+            self.release(endpoint, time.time() - start, failed=failed)
+        return [endpoint for endpoint in self.endpoints if endpoint.healthy]
+
+    @property
+    def stats(self):
+        with self._lock:
+            return [{
+                "url": endpoint.url,
+                "role": endpoint.role,
+                "healthy": endpoint.healthy,
+                "outstanding": endpoint.outstanding,
+                "latency": endpoint.latency,
+                "failures": endpoint.failures,
+            } for endpoint in self.endpoints]
+
+    # Special methods for handle pickling manually
+    def __getstate__(self):
+        return {
+            "endpoints": [(endpoint.url, endpoint.role)
+                          for endpoint in self.endpoints],
+            "balancing": self.balancing,
+            "health_check_interval": self.health_check_interval,
+            "latency_decay": self.latency_decay,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
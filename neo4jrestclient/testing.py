@@ -0,0 +1,1053 @@
+# -*- coding: utf-8 -*-
+"""
+Stand-ins for a Neo4j server, to test and benchmark code using
+neo4jrestclient without network or a running server.
+"""
+import collections
+import fnmatch
+import io
+import json
+import re
+import threading
+import time
+import zlib
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from neo4jrestclient.client import BATCH_REFERENCE
+from neo4jrestclient.request import Transport
+from neo4jrestclient.utils import (
+    smart_quote, string_types, text_type, unquote, urlparse
+)
+
+try:
+    from urlparse import parse_qsl
+except ImportError:
+    from urllib.parse import parse_qsl
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+
+# Types of the values that can be stored as properties
+PROPERTY_TYPES = string_types + (bool, int, float)
+
+# Counters returned by Cypher statements including stats
+STATS = (
+    "contains_updates", "nodes_created", "nodes_deleted",
+    "properties_set", "relationships_created", "relationships_deleted",
+    "labels_added", "labels_removed", "indexes_added", "indexes_removed",
+    "constraints_added", "constraints_removed",
+)
+
+
+class ReplayException(Exception):
+    pass
+
+
+def _decompress(body, encoding=None):
+    if encoding in ("gzip", "deflate"):
+        # Both zlib and gzip headers are detected
+        return zlib.decompress(body, 32 + zlib.MAX_WBITS)
+    return body
+
+
+def _is_property(value):
+    if isinstance(value, (list, tuple)):
+        return all(isinstance(v, PROPERTY_TYPES) for v in value)
+    return isinstance(value, PROPERTY_TYPES)
+
+
+def _get_index_value(value):
+    # Values are indexed as strings, the way they are sent in URLs
+    if isinstance(value, string_types):
+        return text_type(value)
+    return text_type(json.dumps(value))
+
+
+class FakeServer(object):
+    """
+    In-memory stand-in for the REST API of a Neo4j server at url, which
+    implements the service root, nodes, relationships and their properties,
+    labels, legacy indexes, batch operations, and the Cypher and the
+    transactional Cypher endpoints.
+
+    Cypher is not interpreted: queries return the columns and rows added for
+    them with add_query(), or no rows at all.
+
+    Requests are handled in-process by FakeTransport, or over HTTP after
+    calling start().
+    """
+
+    def __init__(self, url="http://localhost:7474/db/data/",
+                 version="2.3.0"):
+        self.version = version
+        self.queries = []
+        self.replicas = {}
+        self.failures = []
+        self._lock = threading.RLock()
+        self._httpd = None
+        self._thread = None
+        self._set_url(url)
+        self.clear()
+
+    def _set_url(self, url):
+        splits = urlparse(url)
+        self.base = u"%s://%s" % (splits.scheme, splits.netloc)
+        self.path = splits.path.rstrip("/")
+        self.url = u"%s%s/" % (self.base, self.path)
+
+    def clear(self):
+        """
+        Remove every node, relationship, index and open transaction.
+        """
+        with self._lock:
+            self.nodes = {}
+            self.relationships = {}
+            self.indexes = {"node": {}, "relationship": {}}
+            self.transactions = {}
+            self._ids = {"node": 0, "relationship": 0, "transaction": 0}
+
+    def _next_id(self, kind):
+        next_id = self._ids[kind]
+        self._ids[kind] += 1
+        return next_id
+
+    def create_node(self, properties=None, labels=None):
+        """
+        Create a node in the graph, returning its id.
+        """
+        with self._lock:
+            node_id = self._next_id("node")
+            self.nodes[node_id] = {
+                "data": dict(properties or {}),
+                "labels": set(labels or []),
+            }
+            return node_id
+
+    def create_relationship(self, start, end, type, properties=None):
+        """
+        Create a relationship between the nodes with ids start and end,
+        returning its id.
+        """
+        with self._lock:
+            relationship_id = self._next_id("relationship")
+            self.relationships[relationship_id] = {
+                "start": start,
+                "end": end,
+                "type": type,
+                "data": dict(properties or {}),
+            }
+            return relationship_id
+
+    def add_query(self, q, columns, rows):
+        """
+        Return columns and rows for the Cypher queries matching q, a string
+        or a compiled regular expression. rows can be a callable receiving
+        the parameters of the query. Nodes and relationships are returned
+        in rows as given by node() and relationship().
+        """
+        self.queries.append((q, columns, rows))
+
+    def add_failure(self, status, times=1, url=None, headers=None,
+                    content=None):
+        """
+        Answer the next times requests, or the next ones whose URL matches
+        the regular expression url, with status, headers and the JSON of
+        content, instead of handling them.
+        """
+        with self._lock:
+            self.failures.append([url and re.compile(url), times, status,
+                                  headers, content])
+
+    def _get_failure(self, url):
+        with self._lock:
+            for failure in self.failures:
+                if failure[0] is None or failure[0].search(url):
+                    failure[1] -= 1
+                    if failure[1] <= 0:
+                        self.failures.remove(failure)
+                    return failure[2:]
+        return None
+
+    def add_replica(self, url, server=None):
+        """
+        Handle the requests to the host of url too, as a read replica always
+        in sync: the graph is the same, but links point to its host. If
+        server is given, the requests are handled by it instead, like by a
+        replica that has not received the last writes.
+        """
+        splits = urlparse(url)
+        self.replicas[u"%s://%s" % (splits.scheme, splits.netloc)] = server
+
+    def node(self, node_id):
+        """
+        Return the representation of a node as sent by the server.
+        """
+        node = self.nodes[node_id]
+        url = u"%snode/%s" % (self.url, node_id)
+        relationships = u"%s/relationships" % url
+        return {
+            "self": url,
+            "data": dict(node["data"]),
+            "metadata": {"id": node_id, "labels": sorted(node["labels"])},
+            "extensions": {},
+            "labels": u"%s/labels" % url,
+            "properties": u"%s/properties" % url,
+            "property": u"%s/properties/{key}" % url,
+            "traverse": u"%s/traverse/{returnType}" % url,
+            "paged_traverse": (u"%s/paged/traverse/{returnType}"
+                               u"{?pageSize,leaseTime}" % url),
+            "create_relationship": relationships,
+            "all_relationships": u"%s/all" % relationships,
+            "incoming_relationships": u"%s/in" % relationships,
+            "outgoing_relationships": u"%s/out" % relationships,
+            "all_typed_relationships": (u"%s/all/{-list|&|types}"
+                                        % relationships),
+            "incoming_typed_relationships": (u"%s/in/{-list|&|types}"
+                                             % relationships),
+            "outgoing_typed_relationships": (u"%s/out/{-list|&|types}"
+                                             % relationships),
+        }
+
+    def relationship(self, relationship_id):
+        """
+        Return the representation of a relationship as sent by the server.
+        """
+        relationship = self.relationships[relationship_id]
+        url = u"%srelationship/%s" % (self.url, relationship_id)
+        return {
+            "self": url,
+            "start": u"%snode/%s" % (self.url, relationship["start"]),
+            "end": u"%snode/%s" % (self.url, relationship["end"]),
+            "type": relationship["type"],
+            "data": dict(relationship["data"]),
+            "metadata": {"id": relationship_id,
+                         "type": relationship["type"]},
+            "extensions": {},
+            "properties": u"%s/properties" % url,
+            "property": u"%s/properties/{key}" % url,
+        }
+
+    def _get_service_root(self):
+        return {
+            "node": u"%snode" % self.url,
+            "node_labels": u"%slabels" % self.url,
+            "node_index": u"%sindex/node" % self.url,
+            "relationship_index": u"%sindex/relationship" % self.url,
+            "relationship_types": u"%srelationship/types" % self.url,
+            "extensions_info": u"%sext" % self.url,
+            "extensions": {},
+            "batch": u"%sbatch" % self.url,
+            "cypher": u"%scypher" % self.url,
+            "transaction": u"%stransaction" % self.url,
+            "neo4j_version": self.version,
+        }
+
+    def handle(self, method, url, body=None):
+        """
+        Handle a request, returning the status code, the headers and the
+        body of the response.
+        """
+        failure = self._get_failure(url)
+        if failure is not None:
+            status, headers, content = failure
+            return self._encode(status, content, headers)
+        replica = None
+        for base, server in self.replicas.items():
+            if url.startswith(base):
+                if server is not None:
+                    return server.handle(method, url, body)
+                replica = base
+        path, query = self._split(url)
+        data = None
+        if body:
+            if isinstance(body, bytes):
+                body = body.decode("utf-8")
+            try:
+                data = json.loads(body)
+            except ValueError:
+                status, content, headers = self._error(
+                    400, "BadInputException", "Invalid JSON")
+                return self._encode(status, content, headers)
+        with self._lock:
+            status, content, headers = self._dispatch(method.upper(), path,
+                                                      query, data)
+        status, headers, body = self._encode(status, content, headers)
+        if replica is not None:
+            body = body.replace(self.base.encode("utf-8"),
+                                replica.encode("utf-8"))
+            if "Location" in headers:
+                headers["Location"] = headers["Location"].replace(self.base,
+                                                                  replica)
+        return status, headers, body
+
+    def _encode(self, status, content, headers=None):
+        headers = dict(headers or {})
+        if content is None:
+            return status, headers, b""
+        headers["Content-Type"] = "application/json; charset=UTF-8"
+        return status, headers, json.dumps(content).encode("utf-8")
+
+    def _split(self, url, relative=False):
+        if relative and "://" not in url:
+            # Relative to the service root, like the jobs of batches
+            url = u"%s/%s" % (self.path, url.lstrip("/"))
+        splits = urlparse(url)
+        return splits.path.rstrip("/"), dict(parse_qsl(splits.query))
+
+    def _error(self, status, exception, message):
+        return status, {"message": message, "exception": exception}, None
+
+    def _dispatch(self, method, path, query, data):
+        if path == self.path:
+            return 200, self._get_service_root(), None
+        elif not path:
+            return 200, {
+                "data": self.url,
+                "management": u"%s/db/manage/" % self.base,
+            }, None
+        elif not path.startswith(u"%s/" % self.path):
+            return self._error(404, "NotFoundException",
+                               "Unknown path %s" % path)
+        parts = [unquote(part)
+                 for part in path[len(self.path) + 1:].split("/")]
+        resource, parts = parts[0], parts[1:]
+        if resource == "node":
+            return self._handle_node(method, parts, data)
+        elif resource == "relationship":
+            return self._handle_relationship(method, parts, data)
+        elif resource == "labels" and not parts and method == "GET":
+            labels = set()
+            for node in self.nodes.values():
+                labels.update(node["labels"])
+            return 200, sorted(labels), None
+        elif (resource == "label" and len(parts) == 2
+                and parts[1] == "nodes" and method == "GET"):
+            return self._get_label_nodes(parts[0], query)
+        elif resource == "index" and parts:
+            return self._handle_index(method, parts, query, data)
+        elif resource == "batch" and not parts and method == "POST":
+            return self._handle_batch(data or [])
+        elif resource == "cypher" and not parts and method == "POST":
+            data = data or {}
+            columns, rows = self._get_query_results(data.get("query", u""),
+                                                    data.get("params", None))
+            return 200, {"columns": columns, "data": rows}, None
+        elif resource == "transaction":
+            return self._handle_transaction(method, parts, data)
+        return self._error(404, "NotFoundException",
+                           "Unknown path %s" % path)
+
+    def _get_id(self, entities, value):
+        # Ids are taken from the last segment of URLs
+        try:
+            entity_id = int(text_type(value).rstrip("/").rsplit("/", 1)[-1])
+        except ValueError:
+            return None
+        if entity_id in entities:
+            return entity_id
+        return None
+
+    def _handle_node(self, method, parts, data):
+        if not parts:
+            if method != "POST":
+                return self._error(405, "MethodNotAllowedException",
+                                   "Method not allowed")
+            data = data or {}
+            if not all(_is_property(v) for v in data.values()):
+                return self._error(400, "PropertyValueException",
+                                   "Could not set property")
+            node_id = self.create_node(data)
+            node = self.node(node_id)
+            return 201, node, {"Location": node["self"]}
+        node_id = self._get_id(self.nodes, parts[0])
+        if node_id is None:
+            return self._error(404, "NodeNotFoundException",
+                               "Cannot find node with id [%s]" % parts[0])
+        parts = parts[1:]
+        if not parts:
+            if method == "GET":
+                return 200, self.node(node_id), None
+            elif method == "DELETE":
+                for relationship in self.relationships.values():
+                    if node_id in (relationship["start"],
+                                   relationship["end"]):
+                        return self._error(
+                            409, "ConstraintViolationException",
+                            "The node with id %s cannot be deleted" % node_id)
+                self._unindex("node", node_id)
+                del self.nodes[node_id]
+                return 204, None, None
+        elif parts[0] == "properties":
+            return self._handle_properties(method, self.nodes, node_id,
+                                           parts[1:], data)
+        elif parts[0] == "labels":
+            return self._handle_labels(method, node_id, parts[1:], data)
+        elif parts[0] == "relationships":
+            return self._handle_node_relationships(method, node_id,
+                                                   parts[1:], data)
+        return self._error(405, "MethodNotAllowedException",
+                           "Method not allowed")
+
+    def _replace(self, entities, entity_id, key, value):
+        # Records are replaced instead of changed, so batches can be rolled
+        # back by restoring shallow copies of the graph
+        entities[entity_id] = dict(entities[entity_id], **{key: value})
+
+    def _handle_properties(self, method, entities, entity_id, parts, data):
+        properties = entities[entity_id]["data"]
+        if not parts:
+            if method == "GET":
+                return 200, dict(properties), None
+            elif method == "PUT":
+                if not isinstance(data, dict) or not all(
+                        _is_property(v) for v in data.values()):
+                    return self._error(400, "PropertyValueException",
+                                       "Could not set properties")
+                self._replace(entities, entity_id, "data", dict(data))
+                return 204, None, None
+            elif method == "DELETE":
+                self._replace(entities, entity_id, "data", {})
+                return 204, None, None
+        elif len(parts) == 1:
+            key = parts[0]
+            if method == "GET":
+                if key not in properties:
+                    return self._error(404, "NoSuchPropertyException",
+                                       "Property not found: %s" % key)
+                return 200, properties[key], None
+            elif method == "PUT":
+                if not _is_property(data):
+                    return self._error(400, "PropertyValueException",
+                                       "Could not set property %s" % key)
+                properties = dict(properties)
+                properties[key] = data
+                self._replace(entities, entity_id, "data", properties)
+                return 204, None, None
+            elif method == "DELETE":
+                if key not in properties:
+                    return self._error(404, "NoSuchPropertyException",
+                                       "Property not found: %s" % key)
+                properties = dict(properties)
+                del properties[key]
+                self._replace(entities, entity_id, "data", properties)
+                return 204, None, None
+        return self._error(405, "MethodNotAllowedException",
+                           "Method not allowed")
+
+    def _handle_labels(self, method, node_id, parts, data):
+        labels = self.nodes[node_id]["labels"]
+        if not parts:
+            if method == "GET":
+                return 200, sorted(labels), None
+            elif method in ("POST", "PUT"):
+                added = data if isinstance(data, list) else [data]
+                if not all(isinstance(label, string_types) and label
+                           for label in added):
+                    return self._error(400, "BadInputException",
+                                       "Invalid label")
+                if method == "PUT":
+                    labels = set()
+                self._replace(self.nodes, node_id, "labels",
+                              labels.union(added))
+                return 204, None, None
+        elif len(parts) == 1 and method == "DELETE":
+            self._replace(self.nodes, node_id, "labels",
+                          labels.difference([parts[0]]))
+            return 204, None, None
+        return self._error(405, "MethodNotAllowedException",
+                           "Method not allowed")
+
+    def _handle_node_relationships(self, method, node_id, parts, data):
+        if not parts and method == "POST":
+            data = data or {}
+            end = self._get_id(self.nodes, data.get("to", u""))
+            if end is None:
+                return self._error(404, "NodeNotFoundException",
+                                   "Cannot find node %s" % data.get("to"))
+            if not data.get("type", None):
+                return self._error(400, "BadInputException",
+                                   "Missing relationship type")
+            relationship_id = self.create_relationship(
+                node_id, end, data["type"], data.get("data", None))
+            relationship = self.relationship(relationship_id)
+            return 201, relationship, {"Location": relationship["self"]}
+        elif (method == "GET" and len(parts) in (1, 2)
+                and parts[0] in ("all", "in", "out")):
+            direction = parts[0]
+            types = None
+            if len(parts) == 2:
+                types = set(parts[1].split("&"))
+            relationships = []
+            for relationship_id in sorted(self.relationships):
+                relationship = self.relationships[relationship_id]
+                if types is not None and relationship["type"] not in types:
+                    continue
+                outgoing = relationship["start"] == node_id
+                incoming = relationship["end"] == node_id
+                if ((direction == "all" and (outgoing or incoming))
+                        or (direction == "out" and outgoing)
+                        or (direction == "in" and incoming)):
+                    relationships.append(self.relationship(relationship_id))
+            return 200, relationships, None
+        return self._error(405, "MethodNotAllowedException",
+                           "Method not allowed")
+
+    def _handle_relationship(self, method, parts, data):
+        if parts == ["types"] and method == "GET":
+            types = set(relationship["type"]
+                        for relationship in self.relationships.values())
+            return 200, sorted(types), None
+        relationship_id = None
+        if parts:
+            relationship_id = self._get_id(self.relationships, parts[0])
+        if relationship_id is None:
+            return self._error(404, "RelationshipNotFoundException",
+                               "Cannot find relationship")
+        parts = parts[1:]
+        if not parts:
+            if method == "GET":
+                return 200, self.relationship(relationship_id), None
+            elif method == "DELETE":
+                self._unindex("relationship", relationship_id)
+                del self.relationships[relationship_id]
+                return 204, None, None
+        elif parts[0] == "properties":
+            return self._handle_properties(method, self.relationships,
+                                           relationship_id, parts[1:], data)
+        return self._error(405, "MethodNotAllowedException",
+                           "Method not allowed")
+
+    def _get_label_nodes(self, label, query):
+        filters = {}
+        for key, value in query.items():
+            try:
+                filters[key] = json.loads(value)
+            except ValueError:
+                return self._error(400, "BadInputException",
+                                   "Invalid value for %s" % key)
+        nodes = []
+        for node_id in sorted(self.nodes):
+            node = self.nodes[node_id]
+            if label in node["labels"] and all(
+                    key in node["data"] and node["data"][key] == value
+                    for key, value in filters.items()):
+                nodes.append(self.node(node_id))
+        return 200, nodes, None
+
+    def _index(self, kind, name):
+        index = self.indexes[kind][name]
+        result = {
+            "template": u"%sindex/%s/%s/{key}/{value}" % (
+                self.url, kind, smart_quote(name)),
+        }
+        result.update(index["config"])
+        return result
+
+    def _indexed(self, kind, name, key, value, entity_id):
+        if kind == "node":
+            entity = self.node(entity_id)
+        else:
+            entity = self.relationship(entity_id)
+        entity["indexed"] = u"%sindex/%s/%s/%s/%s/%s" % (
+            self.url, kind, smart_quote(name), smart_quote(key),
+            smart_quote(value), entity_id)
+        return entity
+
+    def _unindex(self, kind, entity_id):
+        indexes = self.indexes[kind]
+        for name, index in list(indexes.items()):
+            entries = [entry for entry in index["entries"]
+                       if entry[2] != entity_id]
+            if len(entries) != len(index["entries"]):
+                self._replace(indexes, name, "entries", entries)
+
+    def _handle_index(self, method, parts, query, data):
+        kind = parts[0]
+        if kind not in self.indexes:
+            return self._error(404, "NotFoundException",
+                               "Unknown index type %s" % kind)
+        indexes = self.indexes[kind]
+        if len(parts) == 1:
+            if method == "GET":
+                if not indexes:
+                    return 204, None, None
+                return 200, dict((name, self._index(kind, name))
+                                 for name in indexes), None
+            elif method == "POST":
+                data = data or {}
+                name = data.get("name", None)
+                if not name:
+                    return self._error(400, "BadInputException",
+                                       "Missing index name")
+                if name not in indexes:
+                    indexes[name] = {
+                        "config": data.get("config", None) or {
+                            "type": "exact",
+                            "provider": "lucene",
+                        },
+                        "entries": [],
+                    }
+                index = self._index(kind, name)
+                location = index["template"].replace("/{key}/{value}", "")
+                return 201, index, {"Location": location}
+            return self._error(405, "MethodNotAllowedException",
+                               "Method not allowed")
+        name = parts[1]
+        if name not in indexes:
+            return self._error(404, "NotFoundException",
+                               "Index [%s] not found" % name)
+        index = indexes[name]
+        entities = self.nodes if kind == "node" else self.relationships
+        parts = parts[2:]
+        if method == "POST" and not parts:
+            return self._add_to_index(kind, name, query.get("uniqueness"),
+                                      data or {})
+        elif method == "GET" and len(parts) == 2:
+            key, value = parts
+            return 200, [self._indexed(kind, name, k, v, entity_id)
+                         for k, v, entity_id in index["entries"]
+                         if k == key and v == value], None
+        elif method == "GET" and len(parts) < 2 and "query" in query:
+            # Only single terms, with a field or the key as default field
+            key, sep, pattern = query["query"].partition(":")
+            if not sep:
+                key, pattern = (parts or ["*"])[0], key
+            # Fulltext indexes ignore the case
+            fulltext = index["config"].get("type", None) == "fulltext"
+            if fulltext:
+                pattern = pattern.lower()
+            results = []
+            for k, v, entity_id in index["entries"]:
+                if ((key == "*" or k == key) and fnmatch.fnmatchcase(
+                        v.lower() if fulltext else v, pattern)):
+                    results.append(self._indexed(kind, name, k, v, entity_id))
+            return 200, results, None
+        elif method == "DELETE" and not parts:
+            del indexes[name]
+            return 204, None, None
+        elif method == "DELETE" and len(parts) <= 3:
+            entity_id = self._get_id(entities, parts[-1])
+            filters = parts[:-1]
+            entries = [entry for entry in index["entries"]
+                       if entry[2] != entity_id
+                       or tuple(entry[:len(filters)]) != tuple(filters)]
+            if entity_id is None or len(entries) == len(index["entries"]):
+                return self._error(404, "NotFoundException",
+                                   "Entry not found in index %s" % name)
+            self._replace(indexes, name, "entries", entries)
+            return 204, None, None
+        return self._error(405, "MethodNotAllowedException",
+                           "Method not allowed")
+
+    def _add_to_index(self, kind, name, uniqueness, data):
+        index = self.indexes[kind][name]
+        entities = self.nodes if kind == "node" else self.relationships
+        if "key" not in data or "value" not in data:
+            return self._error(400, "BadInputException",
+                               "Missing key or value")
+        key = data["key"]
+        value = _get_index_value(data["value"])
+        if uniqueness is not None:
+            for k, v, entity_id in index["entries"]:
+                if k == key and v == value:
+                    if uniqueness == "create_or_fail":
+                        return self._error(409, "ConflictException",
+                                           "Entity already indexed")
+                    return 200, self._indexed(kind, name, key, value,
+                                              entity_id), None
+        if "uri" in data:
+            entity_id = self._get_id(entities, data["uri"])
+            if entity_id is None:
+                return self._error(404, "NotFoundException",
+                                   "Cannot find %s" % data["uri"])
+        elif uniqueness is None:
+            return self._error(400, "BadInputException", "Missing uri")
+        elif kind == "node":
+            entity_id = self.create_node(data.get("properties", None))
+        else:
+            start = self._get_id(self.nodes, data.get("start", u""))
+            end = self._get_id(self.nodes, data.get("end", u""))
+            if start is None or end is None or not data.get("type", None):
+                return self._error(400, "BadInputException",
+                                   "Missing start, end or type")
+            entity_id = self.create_relationship(
+                start, end, data["type"], data.get("properties", None))
+        entry = (key, value, entity_id)
+        if entry not in index["entries"]:
+            self._replace(self.indexes[kind], name, "entries",
+                          index["entries"] + [entry])
+        entity = self._indexed(kind, name, key, value, entity_id)
+        return 201, entity, {"Location": entity["indexed"]}
+
+    def _handle_batch(self, jobs):
+        # Batches are executed in a transaction, rolled back on errors
+        snapshot = (dict(self.nodes), dict(self.relationships),
+                    dict((kind, dict(indexes))
+                         for kind, indexes in self.indexes.items()),
+                    dict(self._ids))
+        results = {}
+
+        def get_location(match):
+            result = results.get(int(match.group(1)), None)
+            if result is not None:
+                if "location" in result:
+                    return result["location"]
+                elif isinstance(result.get("body", None), dict):
+                    return result["body"].get("self", match.group(0))
+            return match.group(0)
+
+        def resolve(value):
+            if isinstance(value, string_types):
+                return BATCH_REFERENCE.sub(get_location, value)
+            elif isinstance(value, dict):
+                return dict((k, resolve(v)) for k, v in value.items())
+            elif isinstance(value, list):
+                return [resolve(v) for v in value]
+            return value
+
+        responses = []
+        for job in jobs:
+            path, query = self._split(resolve(job["to"]), relative=True)
+            status, content, headers = self._dispatch(
+                job["method"].upper(), path, query, resolve(job.get("body")))
+            if status >= 400:
+                (self.nodes, self.relationships, self.indexes,
+                 self._ids) = snapshot
+                message = u"Job %s failed" % job.get("id", None)
+                if isinstance(content, dict) and "message" in content:
+                    message = u"%s: %s" % (message, content["message"])
+                return self._error(500, "BatchOperationFailedException",
+                                   message)
+            result = {"id": job.get("id", None), "from": job["to"],
+                      "status": status}
+            if content is not None:
+                result["body"] = content
+            if headers and "Location" in headers:
+                result["location"] = headers["Location"]
+            results[result["id"]] = result
+            responses.append(result)
+        return 200, responses, None
+
+    def _get_query_results(self, q, params):
+        for query, columns, rows in self.queries:
+            if isinstance(query, string_types):
+                matches = query.strip() == q.strip()
+            else:
+                matches = query.search(q) is not None
+            if matches:
+                if callable(rows):
+                    rows = rows(params or {})
+                return list(columns), list(rows)
+        return [], []
+
+    def _execute(self, statements):
+        results = []
+        for statement in statements:
+            columns, rows = self._get_query_results(
+                statement.get("statement", u""),
+                statement.get("parameters", None))
+            contents = statement.get("resultDataContents", None) or ["row"]
+            data = []
+            for row in rows:
+                element = {}
+                for content in contents:
+                    if content.lower() == "graph":
+                        element["graph"] = {"nodes": [], "relationships": []}
+                    else:
+                        element[content.lower()] = row
+                data.append(element)
+            result = {"columns": columns, "data": data}
+            if statement.get("includeStats", False):
+                result["stats"] = dict((stat, 0) for stat in STATS)
+                result["stats"]["contains_updates"] = False
+            results.append(result)
+        return results
+
+    def _handle_transaction(self, method, parts, data):
+        statements = (data or {}).get("statements", [])
+        if not parts and method == "POST":
+            transaction_id = self._next_id("transaction")
+            self.transactions[transaction_id] = True
+            url = u"%stransaction/%s" % (self.url, transaction_id)
+            return 201, self._get_transaction(
+                transaction_id, self._execute(statements)), {"Location": url}
+        elif parts == ["commit"] and method == "POST":
+            return 200, {"results": self._execute(statements),
+                         "errors": []}, None
+        transaction_id = None
+        if parts and len(parts) <= 2:
+            transaction_id = self._get_id(self.transactions, parts[0])
+        if transaction_id is None:
+            return 404, {"results": [], "errors": [{
+                "code": "Neo.ClientError.Transaction.UnknownId",
+                "message": "Unrecognized transaction id",
+            }]}, None
+        if parts[1:] == ["commit"] and method == "POST":
+            del self.transactions[transaction_id]
+            return 200, {"results": self._execute(statements),
+                         "errors": []}, None
+        elif len(parts) == 1 and method == "POST":
+            return 200, self._get_transaction(
+                transaction_id, self._execute(statements)), None
+        elif len(parts) == 1 and method == "DELETE":
+            del self.transactions[transaction_id]
+            return 200, {"results": [], "errors": []}, None
+        return self._error(405, "MethodNotAllowedException",
+                           "Method not allowed")
+
+    def _get_transaction(self, transaction_id, results):
+        expires = time.strftime("%a, %d %b %Y %H:%M:%S +0000",
+                                time.gmtime(time.time() + 60))
+        return {
+            "commit": u"%stransaction/%s/commit" % (self.url,
+                                                    transaction_id),
+            "results": results,
+            "transaction": {"expires": expires},
+            "errors": [],
+        }
+
+    def start(self):
+        """
+        Serve the requests over HTTP in a thread, listening on the host and
+        port of url. If the port is 0, a free one is chosen and url updated.
+        """
+        splits = urlparse(self.url)
+        port = splits.port
+        if port is None:
+            port = 443 if splits.scheme == "https" else 80
+        self._httpd = _ThreadingHTTPServer((splits.hostname, port),
+                                           _FakeRequestHandler)
+        self._httpd.fake_server = self
+        if not port:
+            self._set_url(u"%s://%s:%s%s/" % (splits.scheme, splits.hostname,
+                                              self._httpd.server_port,
+                                              self.path))
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+            self._thread = None
+
+    # Special methods for handle pickling manually
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for key in ("_lock", "_httpd", "_thread"):
+            state.pop(key)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        self._httpd = None
+        self._thread = None
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _FakeRequestHandler(BaseHTTPRequestHandler):
+    # Connections are kept alive, like in Neo4j
+    protocol_version = "HTTP/1.1"
+
+    def _handle(self):
+        size = int(self.headers.get("Content-Length", None) or 0)
+        body = _decompress(self.rfile.read(size),
+                           self.headers.get("Content-Encoding", None))
+        status, headers, content = self.server.fake_server.handle(
+            self.command, self.path, body)
+        self.send_response(status)
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _get_response(method, url, status, headers, content):
+    response = Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = "utf-8"
+    response.url = url
+    # Read when accessed, so streamed responses can be iterated
+    response.raw = io.BytesIO(content)
+    return response
+
+
+class FakeSession(object):
+    """
+    Session sending the requests to a FakeServer instead of to the network.
+    """
+
+    def __init__(self, server):
+        self.server = server
+
+    def request(self, method, url, data=None, headers=None, **kwargs):
+        if data:
+            data = _decompress(data, (headers or {}).get("Content-Encoding"))
+        status, response_headers, content = self.server.handle(method, url,
+                                                               data)
+        return _get_response(method, url, status, response_headers, content)
+
+    def close(self):
+        pass
+
+
+class FakeTransport(Transport):
+    """
+    Transport handling the requests in-process with a FakeServer, so the
+    time spent by the client can be measured without network. The features
+    of Transport, like hooks, metrics, retries or limits, keep working.
+
+        >>> server = FakeServer()
+        >>> gdb = GraphDatabase(server.url, transport=FakeTransport(server))
+    """
+
+    def __init__(self, server=None, **kwargs):
+        self.server = server if server is not None else FakeServer()
+        super(FakeTransport, self).__init__(**kwargs)
+
+    def _get_session(self):
+        return FakeSession(self.server)
+
+    def __getstate__(self):
+        state = super(FakeTransport, self).__getstate__()
+        state["server"] = self.server
+        return state
+
+
+class RecordingSession(object):
+    """
+    Session appending every exchange sent by session to the file at path.
+    """
+
+    def __init__(self, session, path, lock):
+        self.session = session
+        self.path = path
+        self._lock = lock
+
+    def request(self, method, url, data=None, headers=None, **kwargs):
+        response = self.session.request(method, url, data=data,
+                                        headers=headers, **kwargs)
+        body = None
+        if data:
+            body = _decompress(data, (headers or {}).get("Content-Encoding"))
+            if isinstance(body, bytes):
+                body = body.decode("utf-8")
+        # Contents are stored decoded, so the transfer headers are dropped
+        response_headers = dict(
+            (header, value) for header, value in response.headers.items()
+            if header.lower() not in ("content-encoding", "content-length",
+                                      "transfer-encoding"))
+        exchange = {
+            "method": method.upper(),
+            "url": url,
+            "body": body,
+            "status": response.status_code,
+            "headers": response_headers,
+            "content": response.content.decode("utf-8"),
+        }
+        line = json.dumps(exchange, sort_keys=True)
+        with self._lock:
+            with io.open(self.path, "a", encoding="utf-8") as f:
+                f.write(u"%s\n" % text_type(line))
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+class RecordingTransport(Transport):
+    """
+    Transport recording the requests sent to a real server, and their
+    responses, as JSON lines appended to the file at path, to be replayed
+    later by ReplayTransport. Streamed responses are read completely when
+    received.
+    """
+
+    def __init__(self, path, **kwargs):
+        self.path = path
+        self._record_lock = threading.Lock()
+        super(RecordingTransport, self).__init__(**kwargs)
+
+    def _get_session(self):
+        session = super(RecordingTransport, self)._get_session()
+        return RecordingSession(session, self.path, self._record_lock)
+
+    def __getstate__(self):
+        state = super(RecordingTransport, self).__getstate__()
+        state["path"] = self.path
+        return state
+
+
+class ReplaySession(object):
+    """
+    Session returning the responses recorded for every method and URL in
+    the order they were recorded.
+    """
+
+    def __init__(self, exchanges):
+        self.exchanges = exchanges
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        key = (method.upper(), url)
+        with self._lock:
+            if not self.exchanges.get(key, None):
+                raise ReplayException("No recorded response for %s %s"
+                                      % key)
+            exchange = self.exchanges[key].popleft()
+        return _get_response(method, url, exchange["status"],
+                             exchange["headers"],
+                             exchange["content"].encode("utf-8"))
+
+    def close(self):
+        pass
+
+
+class ReplayTransport(Transport):
+    """
+    Transport returning the responses recorded by RecordingTransport in the
+    file at path, without sending anything. Requests not recorded, or sent
+    more times than recorded, raise a ReplayException.
+    """
+
+    def __init__(self, path, **kwargs):
+        self.path = path
+        self.exchanges = collections.defaultdict(collections.deque)
+        with io.open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    exchange = json.loads(line)
+                    key = (exchange["method"], exchange["url"])
+                    self.exchanges[key].append(exchange)
+        super(ReplayTransport, self).__init__(**kwargs)
+
+    def _get_session(self):
+        return ReplaySession(self.exchanges)
+
+    def __getstate__(self):
+        state = super(ReplayTransport, self).__getstate__()
+        state["path"] = self.path
+        return state
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import unittest
+import os
+
+from neo4jrestclient import client
+from neo4jrestclient import testing
+
+try:
+    import asyncio
+    from neo4jrestclient import aio
+except (ImportError, SyntaxError):
+    aio = None
+
+
+NEO4J_URL = os.environ.get('NEO4J_URL', "http://localhost:7474/db/data/")
+NEO4J_VERSION = os.environ.get('NEO4J_VERSION', None)
+
+
+@unittest.skipIf(aio is None, "aiohttp is not installed")
+@unittest.skipIf(NEO4J_VERSION in ["1.6.3", "1.7.2", "1.8.3", "1.9.8"],
+                 "Not supported by Neo4j {}".format(NEO4J_VERSION))
+class AsyncGraphDatabaseTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.gdb = aio.AsyncGraphDatabase(NEO4J_URL)
+        self._run(self.gdb.connect())
+
+    def _run(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def tearDown(self):
+        self._run(self.gdb.close())
+        self.loop.close()
+
+    def test_create_get_node(self):
+        n1 = self._run(self.gdb.nodes.create(name="John Doe"))
+        n2 = self._run(self.gdb.nodes[n1.id])
+        self.assertEqual(n1, n2)
+        self.assertEqual(n2.properties, {"name": "John Doe"})
+
+    def test_get_node_not_found(self):
+        self.assertRaises(client.NotFoundError, self._run,
+                          self.gdb.nodes.get(999999999))
+
+    def test_concurrent_queries(self):
+        n = self._run(self.gdb.nodes.create(number=1))
+        q = "start n=node({id}) return n.number"
+
+        async def run_queries():
+            # Gathered inside the loop the futures belong to
+            return await asyncio.gather(*[
+                self.gdb.query(q, params={"id": n.id}) for i in range(50)])
+        results = self._run(run_queries())
+        self.assertEqual(len(results), 50)
+        self.assertEqual(results[-1][0][0], 1)
+
+    def test_relationships_create(self):
+        n1 = self._run(self.gdb.nodes.create(name="John"))
+        n2 = self._run(self.gdb.nodes.create(name="William"))
+        r = self._run(self.gdb.relationships.create(n1, "knows", n2,
+                                                    since=1982))
+        self.assertEqual(r.type, "knows")
+        self.assertEqual(self._run(self.gdb.relationships[r.id]), r)
+
+    def test_labels(self):
+        n = self._run(self.gdb.nodes.create(name="John"))
+        self._run(self.gdb.labels.add(n, "AsyncPerson"))
+        nodes = self._run(self.gdb.labels.get("AsyncPerson", name="John"))
+        self.assertTrue(n in nodes)
+        self.assertTrue("AsyncPerson" in self._run(self.gdb.labels.all()))
+
+    def test_transaction_rollback(self):
+        q = "create (n {name: {name}}) return n"
+        tx = self.gdb.transaction()
+        results = self._run(tx.query(q, params={"name": "Rolled back"},
+                                     returns=client.Node))
+        node = results[0][0]
+        self._run(tx.rollback())
+        self.assertRaises(client.NotFoundError, self._run,
+                          self.gdb.nodes.get(node.id))
+
+    def test_batch(self):
+        batch = self.gdb.batch()
+        batch.append("POST", "/node", {"name": "John"})
+        batch.append("POST", "{0}/labels", ["AsyncPerson"])
+        results = self._run(batch.commit())
+        self.assertEqual(results[0]["data"], {"name": "John"})
+
+    def test_traverse_paginated(self):
+        n1 = self._run(self.gdb.nodes.create(name="John"))
+        for i in range(5):
+            n2 = self._run(self.gdb.nodes.create(number=i))
+            self._run(self.gdb.relationships.create(n1, "knows", n2))
+
+        traversal = self.gdb.traverse(n1, page_size=2, stop=1)
+        pages = []
+        while True:
+            try:
+                pages.append(self._run(traversal.__anext__()))
+            except StopAsyncIteration:
+                break
+        self.assertEqual(sum(len(page) for page in pages), 6)
+
+
+@unittest.skipIf(aio is None, "aiohttp is not installed")
+class AsyncTransportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.server = testing.FakeServer(url="http://localhost:0/db/data/")
+        self.url = self.server.start()
+        self.transport = aio.AsyncTransport(backoff_factor=0)
+        self.gdb = aio.AsyncGraphDatabase(self.url, transport=self.transport)
+        self._run(self.gdb.connect())
+
+    def _run(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def tearDown(self):
+        self._run(self.gdb.close())
+        self.loop.close()
+        self.server.stop()
+
+    def test_retries(self):
+        self.server.add_failure(503)
+        n = self._run(self.gdb.nodes.create(name="John Doe"))
+        self.assertEqual(n["name"], "John Doe")
+        self.assertEqual(self.transport.retries, 1)
+        # Writes that might have been processed are not sent again
+        self.server.add_failure(502)
+        self.assertRaises(client.StatusException, self._run,
+                          self.gdb.nodes.create(name="Mary Doe"))
+        self.assertEqual(self.transport.retries, 1)
+
+    def test_entities_blocking(self):
+        n = self._run(self.gdb.nodes.create(name="John Doe"))
+
+        async def set_name():
+            n["name"] = "Mary Doe"
+        self.assertRaises(aio.BlockingRequestError, self._run, set_name())
+        self.assertEqual(n.properties, {"name": "John Doe"})
+        # Blocking requests are allowed outside of the event loop
+        n["name"] = "Mary Doe"
+        self.assertEqual(self.server.nodes[n.id]["data"],
+                         {"name": "Mary Doe"})
+
+    def test_entities_properties(self):
+        n = self._run(self.gdb.nodes.create(name="John Doe"))
+        self._run(self.gdb.nodes.set_property(n, "age", 42))
+        self.assertEqual(n.properties, {"name": "John Doe", "age": 42})
+        self._run(self.gdb.nodes.delete_property(n, "name"))
+        self.assertEqual(n.properties, {"age": 42})
+        self.assertRaises(client.NotFoundError, self._run,
+                          self.gdb.nodes.delete_property(n, "name"))
+        self._run(self.gdb.nodes.set_properties(n, {"name": "Mary Doe"}))
+        self.assertEqual(n.properties, {"name": "Mary Doe"})
+        self.assertEqual(self.server.nodes[n.id]["data"],
+                         {"name": "Mary Doe"})
+
+    def test_entities_relationships_labels(self):
+        n1 = self._run(self.gdb.nodes.create(name="John"))
+        n2 = self._run(self.gdb.nodes.create(name="William"))
+        r = self._run(self.gdb.relationships.create(n1, "knows", n2))
+        self._run(self.gdb.relationships.set_property(r, "since", 1982))
+        self.assertEqual(r.properties, {"since": 1982})
+        self.assertEqual(self._run(self.gdb.relationships.all(n1)), [r])
+        self.assertEqual(self._run(self.gdb.relationships.incoming(n2)),
+                         [r])
+        self.assertEqual(self._run(self.gdb.relationships.outgoing(
+            n2, types=["knows"])), [])
+        self._run(self.gdb.labels.add(n1, "Person"))
+        self.assertEqual(self._run(self.gdb.labels.all(n1)), ["Person"])
@@ -6,9 +6,11 @@ except ImportError:
 import unittest
 import os
 
+from neo4jrestclient import cache
 from neo4jrestclient import client
 from neo4jrestclient import options
 from neo4jrestclient import request
+from neo4jrestclient.exceptions import NotFoundError
 
 
 NEO4J_URL = os.environ.get('NEO4J_URL', "http://localhost:7474/db/data/")
@@ -29,6 +31,61 @@ class GraphDatabaseTesCase(unittest.TestCase):
             self.gdb.flush()
 
 
+class EntityCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.url = NEO4J_URL
+        self.gdb = client.GraphDatabase(self.url, entity_cache=True)
+
+    def tearDown(self):
+        if self.gdb:
+            self.gdb.flush()
+
+    def test_entity_cache_identity(self):
+        n1 = self.gdb.nodes.create(name="John Doe")
+        n2 = self.gdb.nodes[n1.id]
+        n3 = self.gdb.nodes.get(n1.url)
+        self.assertTrue(n1 is n2)
+        self.assertTrue(n2 is n3)
+
+    def test_entity_cache_relationship_nodes(self):
+        n1 = self.gdb.nodes.create()
+        n2 = self.gdb.nodes.create()
+        r = n1.relationships.create("knows", n2)
+        self.assertTrue(r.start is n1)
+        self.assertTrue(r.end is n2)
+        self.assertTrue(self.gdb.relationships[r.id] is r)
+
+    def test_entity_cache_invalidation(self):
+        n1 = self.gdb.nodes.create(name="John Doe")
+        self.assertTrue(n1.url in self.gdb.entity_cache)
+        n1["name"] = "Jimmy Doe"
+        self.assertFalse(n1.url in self.gdb.entity_cache)
+        n2 = self.gdb.nodes[n1.id]
+        self.assertEqual(n2["name"], "Jimmy Doe")
+        self.assertTrue(n1.url in self.gdb.entity_cache)
+        with self.gdb.transaction():
+            n1["name"] = "John Doe"
+        self.assertEqual(self.gdb.nodes[n1.id]["name"], "John Doe")
+
+    def test_entity_cache_delete(self):
+        n1 = self.gdb.nodes.create(name="John Doe")
+        url = n1.url
+        n1.delete()
+        self.assertFalse(url in self.gdb.entity_cache)
+        self.assertRaises(NotFoundError, self.gdb.nodes.get, url)
+
+    def test_entity_cache_stats(self):
+        entity_cache = cache.EntityCache(max_size=2)
+        gdb = client.GraphDatabase(self.url, entity_cache=entity_cache)
+        nodes = [gdb.nodes.create() for i in range(3)]
+        stats = gdb.entity_cache.stats
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        gdb.nodes[nodes[-1].id]
+        self.assertEqual(gdb.entity_cache.stats["hits"], stats["hits"] + 1)
+
+
 class FakeCache(object):
     def __init__(self, called):
         self.called = called
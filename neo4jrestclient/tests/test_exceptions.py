@@ -2,7 +2,8 @@
 import unittest
 
 from neo4jrestclient.exceptions import (
-    StatusException, NotFoundError, TransactionException
+    StatusException, NotFoundError, TransactionException,
+    PartialTransactionException
 )
 
 
@@ -22,3 +23,8 @@ class ExceptionsTestCase(unittest.TestCase):
 
     def test_transaction_params(self):
         TransactionException(200, "Message")
+
+    def test_partial_transaction_exception(self):
+        e = PartialTransactionException(500, "Message", committed={0: {}})
+        self.assertTrue(isinstance(e, TransactionException))
+        self.assertEqual(e.committed, {0: {}})
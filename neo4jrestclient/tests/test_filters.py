@@ -185,3 +185,50 @@ class FilterTestCase(GraphDatabaseTesCase):
         lookup = Q("number", inrange=[t1, t2])
         nodes = self.gdb.nodes.filter(lookup)
         self.assertTrue(len(nodes) == 10)
+
+    @unittest.skipIf(NEO4J_VERSION in ["1.6.3", "1.7.2"],
+                     "Not supported by Neo4j {}".format(NEO4J_VERSION))
+    def test_filter_count_exists_aggregate(self):
+        Q = query.Q
+        t = randint(1, 10 ** 10)
+        for i in range(5):
+            self.gdb.nodes.create(number=t, code=i)
+        nodes = self.gdb.nodes.filter(Q("number", exact=t))
+        self.assertEqual(nodes.count(), 5)
+        self.assertTrue(nodes.exists())
+        self.assertFalse(self.gdb.nodes.filter(Q("number", exact=-t)).exists())
+        self.assertEqual(nodes.aggregate(sum="code", min="code", max="code"),
+                         {"sum": 10, "min": 0, "max": 4})
+        self.assertRaises(ValueError, nodes.aggregate, median="code")
+
+    @unittest.skipIf(NEO4J_VERSION in ["1.6.3", "1.7.2"],
+                     "Not supported by Neo4j {}".format(NEO4J_VERSION))
+    def test_filter_count_slice(self):
+        Q = query.Q
+        t = randint(1, 10 ** 10)
+        for i in range(5):
+            self.gdb.nodes.create(number=t, code=i)
+        nodes = self.gdb.nodes.filter(Q("number", exact=t))
+        self.assertEqual(nodes.count(), 5)
+        self.assertEqual(len(nodes[:2]), 2)
+        # Only the elements in the slice are counted, as values() does
+        self.assertEqual(nodes.count(), 2)
+        self.assertEqual(len(nodes.values("code")), 2)
+        self.assertTrue(nodes.exists())
+
+    @unittest.skipIf(NEO4J_VERSION in ["1.6.3", "1.7.2"],
+                     "Not supported by Neo4j {}".format(NEO4J_VERSION))
+    def test_filter_values(self):
+        Q = query.Q
+        t = randint(1, 10 ** 10)
+        nodes = [self.gdb.nodes.create(number=t, code=i) for i in range(3)]
+        lookup = Q("number", exact=t)
+        williams = self.gdb.nodes.filter(lookup).order_by("code")
+        self.assertEqual(williams.values("code"),
+                         [{"code": 0}, {"code": 1}, {"code": 2}])
+        self.assertEqual(williams.values_list("id", "code"),
+                         [(n.id, n["code"]) for n in nodes])
+        self.assertEqual(williams.values_list("id", flat=True),
+                         [n.id for n in nodes])
+        self.assertRaises(TypeError, williams.values_list, "id", "code",
+                          flat=True)
@@ -89,6 +89,19 @@ class IndicesTestCase(GraphDatabaseTesCase):
         self.assertRaises(NotFoundError,
                           index["surnames"].__getitem__, "d")
 
+    def test_indexes_cached(self):
+        self.assertTrue(self.gdb.nodes.indexes is self.gdb.nodes.indexes)
+        index = self.gdb.nodes.indexes.create(name="doe")
+        self.assertTrue(self.gdb.nodes.indexes.get("doe") is index)
+        index.delete()
+        self.assertRaises(NotFoundError, self.gdb.nodes.indexes.get, "doe")
+        other_gdb = client.GraphDatabase(self.url)
+        other_index = other_gdb.nodes.indexes.create(name="doe")
+        self.assertRaises(NotFoundError, self.gdb.nodes.indexes.get, "doe")
+        self.gdb.nodes.indexes.refresh()
+        self.assertEqual(self.gdb.nodes.indexes.get("doe"), other_index)
+        other_index.delete()
+
     def test_create_index_for_relationships(self):
         n1 = self.gdb.nodes.create(name="John Doe", place="Texas")
         n2 = self.gdb.nodes.create(name="Michael Doe", place="Tijuana")
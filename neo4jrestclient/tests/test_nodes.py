@@ -95,6 +95,27 @@ class NodesTestCase(GraphDatabaseTesCase):
         self.assertEqual(n.get("time"), t)
         clientSmartDates.SMART_DATES = False
 
+    def test_create_node_date_before_1900(self):
+        from neo4jrestclient import options as clientSmartDates
+        clientSmartDates.SMART_DATES = True
+        dt = datetime(1850, 3, 4, 5, 6, 7, 890)
+        n = self.gdb.nodes.create(name="John Doe", datetime=dt, age=30,
+                                  surname="Doe")
+        n2 = self.gdb.nodes.get(n.id)
+        self.assertEqual(n2["datetime"], dt)
+        self.assertEqual(n2["age"], 30)
+        self.assertEqual(n2["surname"], "Doe")
+        clientSmartDates.SMART_DATES = False
+
+    def test_create_node_date_trailing_newline(self):
+        from neo4jrestclient import options as clientSmartDates
+        clientSmartDates.SMART_DATES = True
+        # Rejected by strptime, so it's not a date
+        value = u"2020-01-02T10:11:12.5\n"
+        n = self.gdb.nodes.create(note=value)
+        self.assertEqual(self.gdb.nodes.get(n.id)["note"], value)
+        clientSmartDates.SMART_DATES = False
+
     def test_get_node(self):
         n1 = self.gdb.nodes.create(name="John Doe", profession="Hacker")
         n2 = self.gdb.nodes.get(n1.id)
@@ -199,3 +220,59 @@ class NodesTestCase(GraphDatabaseTesCase):
         n2 = self.gdb.node[n1.id]
         self.assertEqual(len(set([n1, n2])), 1)
         self.assertEqual(hash(n1), hash(n2))
+
+    def test_get_node_lazy(self):
+        from neo4jrestclient import options as clientLazy
+        self.addCleanup(setattr, clientLazy, "LAZY_LOADING",
+                        clientLazy.LAZY_LOADING)
+        clientLazy.LAZY_LOADING = True
+        n1 = self.gdb.nodes.create(name="John Doe", profession="Hacker")
+        n2 = self.gdb.nodes[n1.id]
+        self.assertTrue(n2._lazy)
+        self.assertEqual(n1, n2)
+        self.assertEqual(n1.id, n2.id)
+        self.assertTrue(n2._lazy)
+        self.assertEqual(n1.properties, n2.properties)
+        self.assertFalse(n2._lazy)
+
+    def test_get_node_lazy_not_found(self):
+        from neo4jrestclient import options as clientLazy
+        self.addCleanup(setattr, clientLazy, "LAZY_LOADING",
+                        clientLazy.LAZY_LOADING)
+        clientLazy.LAZY_LOADING = True
+        n1 = self.gdb.nodes.create(name="John Doe", profession="Hacker")
+        identifier = n1.id
+        n1.delete()
+        n2 = self.gdb.nodes[identifier]
+        self.assertRaises(NotFoundError, lambda: n2.properties)
+        # Failed loads are tried again
+        self.assertTrue(n2._lazy)
+        self.assertRaises(NotFoundError, lambda: n2.properties)
+        self.assertEqual(self.gdb.nodes.get(identifier, None), None)
+
+    def test_create_many_nodes(self):
+        properties = [{"name": "John Doe %s" % i, "age": i} for i in range(5)]
+        nodes = self.gdb.nodes.create_many(properties, labels="Person",
+                                           chunk_size=2)
+        self.assertEqual(len(nodes), 5)
+        self.assertTrue(all(n._lazy for n in nodes))
+        self.assertEqual(nodes[3].properties, properties[3])
+        self.assertTrue("Person" in nodes[3].labels)
+        self.assertEqual(self.gdb.nodes.create_many([]), [])
+
+    def test_get_many_nodes(self):
+        n1 = self.gdb.nodes.create(name="John Doe")
+        n2 = self.gdb.nodes.create(name="Mary Doe")
+        identifier = self.gdb.nodes.create().id
+        self.gdb.nodes[identifier].delete()
+        ids = [n2.id, identifier, n1.id]
+        nodes = self.gdb.nodes.get_many(ids, chunk_size=1)
+        self.assertEqual(nodes, [n2, n1])
+        self.assertFalse(nodes[0]._lazy)
+        self.assertEqual(nodes[0]["name"], "Mary Doe")
+        self.assertEqual(self.gdb.nodes.get_many(ids, missing="none"),
+                         [n2, None, n1])
+        self.assertRaises(NotFoundError, self.gdb.nodes.get_many, ids,
+                          missing="raise")
+        self.assertRaises(ValueError, self.gdb.nodes.get_many, ids,
+                          missing="ignore")
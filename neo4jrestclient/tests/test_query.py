@@ -3,7 +3,7 @@ from datetime import datetime
 import unittest
 import os
 
-from neo4jrestclient import client, constants, options
+from neo4jrestclient import client, constants, options, query
 from neo4jrestclient.exceptions import TransactionException
 from neo4jrestclient.utils import text_type
 
@@ -321,3 +321,33 @@ class QueryTestCase(GraphDatabaseTesCase):
         q = """start n=node(*) return n limit 10"""
         result = self.gdb.query(q=q, data_contents=True)
         self.assertTrue(result.stats is not None)
+
+    @unittest.skipIf(NEO4J_VERSION in ["1.6.3"],
+                     "Not supported by Neo4j {}".format(NEO4J_VERSION))
+    def test_query_stream(self):
+        nodes = [self.gdb.nodes.create(number=i) for i in range(10)]
+        q = """start n=node({ids}) return n, n.number order by n.number"""
+        params = {"ids": [n.id for n in nodes]}
+        results = self.gdb.query(q, params=params,
+                                 returns=(client.Node, int), stream=True)
+        for i, (node, number) in enumerate(results):
+            self.assertEqual(node, nodes[i])
+            self.assertEqual(number, i)
+        self.assertEqual(i, 9)
+        self.assertEqual(len(results.columns), 2)
+
+    def test_query_is_read(self):
+        self.assertTrue(query.is_read_query("start n=node(*) return n"))
+        self.assertTrue(query.is_read_query(
+            "MATCH (n) WHERE n.created > 1 RETURN n"))
+        self.assertFalse(query.is_read_query("CREATE (n) RETURN n"))
+        self.assertFalse(query.is_read_query("MATCH (n) DETACH DELETE n"))
+        self.assertFalse(query.is_read_query("MATCH (n) set n.name = 'J'"))
+
+    @unittest.skipIf(NEO4J_VERSION in ["1.6.3"],
+                     "Not supported by Neo4j {}".format(NEO4J_VERSION))
+    def test_query_stream_inside_transaction(self):
+        q = """start n=node(*) return n"""
+        with self.gdb.transaction(for_query=True) as tx:
+            self.assertRaises(client.CypherException, self.gdb.query, q,
+                              stream=True, tx=tx)
@@ -104,3 +104,71 @@ class RelationshipsTestCase(GraphDatabaseTesCase):
         rel.delete()
         self.assertRaises(NotFoundError, self.gdb.relationships.get,
                           rel_id)
+
+    def test_create_many_relationships(self):
+        n1 = self.gdb.nodes.create()
+        n2 = self.gdb.nodes.create(key="create_many")
+        n2.labels.add("CreateMany")
+        stats = []
+        rows = [
+            (n1, n2, {"since": 1970}),
+            (n2.id, n1.id),
+            (n1, ("CreateMany", "key", "create_many")),
+            (n1, -1),
+        ]
+        rels = self.gdb.relationships.create_many(rows, type="Knows",
+                                                  on_chunk=stats.append)
+        self.assertEqual(rels[0].properties, {"since": 1970})
+        self.assertEqual(rels[1].start, n2)
+        self.assertEqual(rels[2].end, n2)
+        self.assertEqual(rels[3], None)
+        # Statistics of the statements of a chunk are added up
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]["relationships_created"], 3)
+        self.assertTrue(stats[0]["contains_updates"])
+        # Merged relationships are not created again
+        rels = self.gdb.relationships.create_many(rows[:1], type="Knows",
+                                                  merge=True)
+        self.assertEqual(rels[0].properties, {"since": 1970})
+        self.assertEqual(len(n1.relationships.outgoing(["Knows"])), 2)
+
+    def test_create_many_relationships_chunks(self):
+        n1 = self.gdb.nodes.create()
+        n2 = self.gdb.nodes.create()
+        consumed = []
+
+        def rows():
+            for i in range(4):
+                consumed.append(i)
+                yield (n1, n2)
+        sent = []
+        rels = self.gdb.relationships.create_many(
+            rows(), type="Knows", chunk_size=2,
+            on_chunk=lambda stats: sent.append(len(consumed)))
+        # Every chunk is sent before the next rows are generated
+        self.assertEqual(sent, [2, 4])
+        self.assertEqual(len(rels), 4)
+        self.assertEqual(len(n1.relationships.outgoing(["Knows"])), 4)
+
+    def test_create_many_relationships_lookups_unique(self):
+        n1 = self.gdb.nodes.create()
+        for i in range(2):
+            n = self.gdb.nodes.create(key="create_many_unique")
+            n.labels.add("CreateMany")
+        rows = [(n1, ("CreateMany", "key", "create_many_unique"))]
+        self.assertRaises(ValueError, self.gdb.relationships.create_many,
+                          rows, type="Knows")
+        self.assertEqual(len(n1.relationships.all()), 0)
+
+    def test_get_many_relationships(self):
+        n1 = self.gdb.nodes.create()
+        n2 = self.gdb.nodes.create()
+        rel1 = n1.relationships.create("Knows", n2, since=1970)
+        rel2 = n2.relationships.create("Knows", n1, since=1980)
+        gdb = client.GraphDatabase(self.url, entity_cache=True)
+        # Cached relationships are not requested again
+        gdb.relationships[rel1.id]["since"]
+        rels = gdb.relationships.get_many([rel2.id, rel1.id])
+        self.assertEqual(rels, [rel2, rel1])
+        self.assertEqual(rels[0]["since"], 1980)
+        self.assertEqual(gdb.entity_cache.stats["misses"], 1)
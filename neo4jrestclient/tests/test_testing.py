@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from neo4jrestclient import client
+from neo4jrestclient import testing
+
+
+class FakeServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = testing.FakeServer()
+        self.gdb = client.GraphDatabase(
+            self.server.url, transport=testing.FakeTransport(self.server))
+
+    def test_fake_nodes(self):
+        n = self.gdb.nodes.create(name="John Doe", age=30)
+        n["age"] = 31
+        self.assertEqual(self.gdb.nodes[n.id].properties,
+                         {"name": "John Doe", "age": 31})
+        del n["age"]
+        self.assertEqual(self.server.nodes[n.id]["data"],
+                         {"name": "John Doe"})
+        n.delete()
+        self.assertRaises(client.NotFoundError, self.gdb.nodes.get, n.id)
+
+    def test_fake_relationships(self):
+        n1 = self.gdb.nodes.create(name="John Doe")
+        n2 = self.gdb.nodes.create(name="Mary Doe")
+        r = n1.relationships.create("Knows", n2, since=2010)
+        self.assertEqual(r.start, n1)
+        self.assertEqual(r.end, n2)
+        self.assertEqual(r["since"], 2010)
+        self.assertEqual(len(n1.relationships.outgoing(["Knows"])), 1)
+        self.assertEqual(len(n1.relationships.incoming()), 0)
+        self.assertEqual(len(n2.relationships.all()), 1)
+        # Nodes with relationships can't be deleted
+        self.assertRaises(client.StatusException, n1.delete)
+
+    def test_fake_labels_and_indexes(self):
+        n = self.gdb.nodes.create(name="John Doe")
+        n.labels.add(["Person", "Father"])
+        self.assertEqual(set(label._label for label in self.gdb.labels),
+                         set(["Person", "Father"]))
+        label = self.gdb.labels.get("Person")
+        self.assertEqual(list(label.get(name="John Doe")), [n])
+        index = self.gdb.nodes.indexes.create("people", type="exact")
+        index["name"]["John Doe"] = n
+        self.assertEqual(list(index["name"]["John Doe"]), [n])
+        self.assertEqual(list(index.query("name:John*")), [n])
+
+    def test_fake_batch(self):
+        n1 = self.gdb.nodes.create(name="John Doe")
+        with self.gdb.transaction():
+            n2 = self.gdb.nodes.create(name="Mary Doe")
+            n2.relationships.create("Knows", n1)
+        self.assertEqual(n2["name"], "Mary Doe")
+        self.assertEqual(len(self.server.relationships), 1)
+        # Failed batches are rolled back
+        tx = self.gdb.transaction(commit=False)
+        self.gdb.nodes.create(name="Nobody", tx=tx)
+        self.gdb.relationships.delete(1000, tx=tx)
+        self.assertRaises(client.TransactionException, tx.commit)
+        self.assertEqual(len(self.server.nodes), 2)
+
+    def test_fake_batch_partial(self):
+        tx = self.gdb.transaction(commit=False, max_operations=2)
+        self.gdb.nodes.create(name="John Doe", tx=tx)
+        self.gdb.nodes.create(name="Mary Doe", tx=tx)
+        self.gdb.relationships.delete(1000, tx=tx)
+        # Only the failed batch is rolled back
+        with self.assertRaises(client.PartialTransactionException) as cm:
+            tx.commit()
+        self.assertEqual(sorted(cm.exception.committed), [0, 1])
+        self.assertEqual(len(self.server.nodes), 2)
+
+    def test_fake_query(self):
+        n = self.gdb.nodes.create(name="John Doe")
+        self.server.add_query(re.compile(r"RETURN n$"), ["n"],
+                              lambda params: [[self.server.node(n.id)]])
+        results = self.gdb.query("MATCH (n) RETURN n", returns=client.Node)
+        self.assertEqual(results[0][0], n)
+        self.assertEqual(len(self.gdb.query("MATCH (m) RETURN m")), 0)
+
+    def test_fake_record_replay(self):
+        self.server = testing.FakeServer(url="http://localhost:0/db/data/")
+        url = self.server.start()
+        tmp = tempfile.mkdtemp()
+        path = os.path.join(tmp, "session.jsonl")
+        try:
+            gdb = client.GraphDatabase(
+                url, transport=testing.RecordingTransport(path))
+            n = gdb.nodes.create(name="John Doe")
+            self.server.stop()
+            gdb = client.GraphDatabase(
+                url, transport=testing.ReplayTransport(path))
+            self.assertEqual(gdb.nodes.create(name="John Doe").url, n.url)
+            self.assertRaises(testing.ReplayException, gdb.nodes.create,
+                              name="Mary Doe")
+        finally:
+            self.server.stop()
+            shutil.rmtree(tmp)
@@ -510,6 +510,44 @@ class TransactionsTestCase(GraphDatabaseTesCase):
         rel_ca = c.relationships.outgoing()[0]
         assert(rel_ca.start == c and rel_ca.end == a)
 
+    def test_transaction_update_many(self):
+        nodes = [self.gdb.nodes.create(number=i) for i in range(5)]
+        deleted = self.gdb.nodes.create()
+        with self.gdb.transaction():
+            for i, node in enumerate(nodes):
+                node["name"] = "John Doe"
+                node["number"] = i + 1
+            deleted.delete()
+        for i, node in enumerate(nodes):
+            self.assertEqual(node.properties, {"name": "John Doe",
+                                               "number": i + 1})
+        self.assertEqual(deleted, None)
+
+    def test_transaction_max_operations(self):
+        with self.gdb.transaction(max_operations=2):
+            n1 = self.gdb.nodes.create(name="a")
+            n2 = self.gdb.nodes.create(name="b")
+            n3 = self.gdb.nodes.create(name="c")
+            rel1 = n1.relationships.create("Knows", n2, since=1980)
+            rel2 = n3.relationships.create("Knows", n1)
+        self.assertTrue(isinstance(n3, client.Node))
+        self.assertEqual(n3["name"], "c")
+        self.assertEqual(rel1.start, n1)
+        self.assertEqual(rel1.end, n2)
+        self.assertEqual(rel1.properties, {"since": 1980})
+        self.assertEqual(rel2.start, n3)
+        self.assertEqual(rel2.end, n1)
+
+    def test_transaction_max_bytes(self):
+        with self.gdb.transaction(max_bytes=256) as tx:
+            nodes = [self.gdb.nodes.create(number=i) for i in range(10)]
+            for i in range(1, 10):
+                nodes[i].relationships.create("Follows", nodes[i - 1])
+            operations = len(tx.operations)
+        self.assertEqual(operations, 19)
+        self.assertEqual(nodes[9].relationships.outgoing()[0].end, nodes[8])
+        self.assertEqual([n["number"] for n in nodes], list(range(10)))
+
     # Test from neo4j-googlegroup#149666f627da6c05
     def test_transaction_relationship_is_destroyed_after_transaction(self):
         a = self.gdb.nodes.create()
@@ -61,6 +61,22 @@ class TraversalsTestCase(GraphDatabaseTesCase):
         self.assertTrue(isinstance(start_node, client.Node))
         self.assertTrue(isinstance(relationship, client.Relationship))
 
+    def test_path_traversal_hydrate(self):
+        nodes = [self.gdb.nodes.create(number=i) for i in range(5)]
+        for n1, n2 in zip(nodes[:-1], nodes[1:]):
+            n1.relationships.create("Knows", n2, since=n1["number"])
+        types = [
+            client.Outgoing.Knows,
+        ]
+        traversal = nodes[0].traverse(types=types, stop=4,
+                                      returns=constants.PATH)
+        path = max(traversal, key=len)
+        self.assertTrue(all(element._lazy for element in path))
+        path.hydrate()
+        self.assertFalse(any(element._lazy for element in path))
+        self.assertEqual([n["number"] for n in path.nodes], list(range(5)))
+        self.assertEqual(path.last_relationship.properties, {"since": 3})
+
     def test_path_traversal_getitem(self):
         # Test from @shahin: https://gist.github.com/1418704
         n1 = self.gdb.node()
@@ -113,7 +113,9 @@ class Traverser(object):
             return self._cache[return_type]
         except KeyError:
             url = self._endpoint.replace("{returnType}", return_type)
-            response = Request(**self._auth).post(url, data=self._data)
+            # Traversals don't change the graph, so they can be retried
+            response = Request(**self._auth).post(url, data=self._data,
+                                                  idempotent=True)
             if response.status_code == 200:
                 results_list = response.json()
                 self._cache[return_type] = results_list
@@ -113,3 +113,26 @@ def rewrites(obj):
             return obj
     else:
         return obj
+
+
+def rebase(obj, base_from, base_to):
+    """
+    Return obj with the URLs starting with base_from moved to base_to, as
+    for the links sent by a replica of the server requested. Properties,
+    in the "data" of elements and in rows, are not changed.
+    """
+    if isinstance(obj, string_types):
+        if obj.startswith(base_from):
+            return base_to + obj[len(base_from):]
+        return obj
+    elif isinstance(obj, dict):
+        ignored_keys = ("row", )
+        if "self" in obj:
+            ignored_keys = ("row", "data")
+        return dict((k, v if k in ignored_keys
+                     else rebase(v, base_from, base_to))
+                    for k, v in obj.items())
+    elif isinstance(obj, list):
+        return [rebase(elem, base_from, base_to) for elem in obj]
+    else:
+        return obj
@@ -50,5 +50,7 @@ setup(
     ],
     tests_require=tests_require,
     test_suite='neo4jrestclient.tests',
-    extras_require={},
+    extras_require={
+        'async': ['aiohttp>=3.0'],
+    },
 )